@@ -0,0 +1,70 @@
+"""tools/list handler throughput: rebuilding the Tool objects per request vs the startup catalog.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_list_tools --seconds 2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import mcp.types as types
+from mcp.server.lowlevel import Server
+
+from src.qloo_mcp_server.catalog import CATALOG_PATH, ToolCatalog
+
+
+def rebuilding_server() -> Server:
+    # What list_tools used to do: construct every types.Tool from literals on each request.
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        raw = json.load(f)["tools"]
+    catalog = ToolCatalog.load()
+    raw = [{**entry, "inputSchema": catalog.by_name[entry["name"]].inputSchema} for entry in raw]
+    server = Server("bench")
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        return [types.Tool(**json.loads(json.dumps(entry))) for entry in raw]
+
+    return server
+
+
+def catalog_server() -> Server:
+    catalog = ToolCatalog.load()
+    server = Server("bench")
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        return catalog.tools
+
+    return server
+
+
+async def throughput(server: Server, seconds: float) -> float:
+    handler = server.request_handlers[types.ListToolsRequest]
+    request = types.ListToolsRequest(method="tools/list")
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        result = await handler(request)
+        result.model_dump_json(by_alias=True, exclude_none=True)
+        count += 1
+    return count / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ToolCatalog.load()
+    print(f"catalog load: {(time.perf_counter() - start) * 1000:.1f} ms (once, at startup)")
+    for name, factory in (("rebuild per request", rebuilding_server), ("startup catalog", catalog_server)):
+        rate = asyncio.run(throughput(factory(), args.seconds))
+        print(f"{name:>20}: {rate:,.0f} tools/list per second")
+
+
+if __name__ == "__main__":
+    main()
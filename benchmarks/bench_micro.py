@@ -0,0 +1,78 @@
+"""Micro-benchmarks for the per-call CPU work: clean_response,
+clean_audience_response, argument and filter validation and encode_form_query
+(against the encoder it replaced) on realistic payload sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_micro
+"""
+import argparse
+import timeit
+
+import httpx
+import jsonschema
+
+from benchmarks.encoding_properties import reference_encode_form_query
+from benchmarks.payloads import audiences_body, insights_body
+from src.qloo_mcp_server.catalog import ToolCatalog
+from src.qloo_mcp_server.filter_schema import get_filter_validator
+from src.qloo_mcp_server.get_audience import clean_audience_response
+from src.qloo_mcp_server.get_insights import clean_response
+from src.qloo_mcp_server.prune import JSON_BACKEND
+from src.qloo_mcp_server.utils import encode_form_query, query_key
+
+QUERY = {
+    "filter.type": "urn:entity:place",
+    "filter.location.query": "New York City, NY",
+    "filter.price_level.min": 2,
+    "filter.price_level.max": 4,
+    "filter.external.resy.rating.min": 4.5,
+    "filter.audience.types": ["urn:audience:life_stage:millennials", "urn:audience:leisure:foodies"],
+    "filter.exclude.location.geohash": None,
+    "take": 50,
+}
+
+
+def report(name: str, fn, number: int, repeat: int) -> None:
+    best = min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+    unit, scale = ("us", 1e6) if best < 1e-3 else ("ms", 1e3)
+    print(f"{name:<42} {best * scale:>10.2f} {unit}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    for take in (10, 100, 1000):
+        body = insights_body(take)
+        number = max(1, 2000 // take)
+        report(f"clean_response take={take} ({len(body) // 1024} KiB)",
+               lambda: clean_response(httpx.Response(200, content=body)), number, args.repeat)
+    for count in (50, 500, 5000):
+        body = audiences_body(count)
+        number = max(1, 20000 // count)
+        report(f"clean_audience_response n={count} ({len(body) // 1024} KiB)",
+               lambda: clean_audience_response(httpx.Response(200, content=body)), number, args.repeat)
+    catalog = ToolCatalog.load()
+    schema = catalog.by_name["get_insights"].inputSchema
+    # The same query as tool arguments, as they arrive before normalization.
+    filters = {k: v for k, v in QUERY.items() if k != "filter.type" and v is not None}
+    filters["filter.audience.types"] = ",".join(filters["filter.audience.types"])
+    arguments = {"entity_type": QUERY["filter.type"], "filters": filters}
+    report("jsonschema.validate get_insights", lambda: jsonschema.validate(arguments, schema), 20, args.repeat)
+    report("catalog.validate_arguments get_insights",
+           lambda: catalog.validate_arguments("get_insights", arguments), 2000, args.repeat)
+    validator = get_filter_validator()
+    report("filter validator normalize (8 filters)", lambda: validator.normalize(QUERY), 20000, args.repeat)
+    report("reference encoder (8 filters)", lambda: reference_encode_form_query(QUERY), 20000, args.repeat)
+    report("encode_form_query (8 filters)", lambda: encode_form_query(QUERY), 20000, args.repeat)
+    report("encode_form_query canonical (8 filters)",
+           lambda: encode_form_query(QUERY, canonical=True), 20000, args.repeat)
+    report("canonical + query_key (8 filters)",
+           lambda: query_key(encode_form_query(QUERY, canonical=True)), 20000, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
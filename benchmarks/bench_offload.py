@@ -0,0 +1,67 @@
+"""Event-loop stalls while large get_insights responses are cleaned, per offload mode.
+
+A heartbeat task ticks every millisecond while ``--jobs`` large bodies are
+cleaned concurrently. Its worst and p99 delay is how long every other MCP
+session would have been blocked.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_offload --take 1000 --jobs 16
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+from benchmarks.payloads import insights_body
+from src.qloo_mcp_server.get_insights import clean_response_async
+from src.qloo_mcp_server.offload import MODES, configure_offloader
+
+
+async def heartbeat(delays: List[float], stop: asyncio.Event, interval: float = 0.001) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        delays.append(time.perf_counter() - start - interval)
+
+
+async def run(mode: str, body: bytes, jobs: int, workers: int) -> None:
+    offloader = configure_offloader(mode=mode, workers=workers, threshold=0)
+    if mode != "off":
+        # Start the pool (and, in process mode, the interpreters) outside the measurement.
+        await asyncio.gather(*(clean_response_async(httpx.Response(200, content=body)) for _ in range(workers)))
+
+    delays: List[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(delays, stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(clean_response_async(httpx.Response(200, content=body)) for _ in range(jobs)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    offloader.close()
+
+    assert all("results" in result for result in results)
+    delays.sort()
+    p99 = delays[min(len(delays) - 1, int(0.99 * len(delays)))]
+    print(f"{mode:<8} {elapsed * 1000:>9.1f} ms total  loop stall max {delays[-1] * 1000:>7.1f} ms  p99 {p99 * 1000:>6.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--take", type=int, default=1000, help="Entities per response")
+    parser.add_argument("--jobs", type=int, default=16, help="Responses cleaned concurrently")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    body = insights_body(args.take)
+    print(f"{args.jobs} responses of {len(body) // 1024} KiB, {args.workers} offload workers")
+    for mode in MODES:
+        asyncio.run(run(mode, body, args.jobs, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Bytes on the wire and serialization time of get_insights tool results.
+
+Compares the default output (indented JSON text plus structuredContent, as
+the MCP SDK renders a dict result) with ``output: "compact"``, each as the
+JSON-RPC response body the server sends, uncompressed, gzip and br.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_output
+"""
+import argparse
+import json
+import timeit
+import zlib
+
+import httpx
+import mcp.types as types
+
+from benchmarks.payloads import insights_body
+from src.qloo_mcp_server.compact import compact_tool_result, dumps_compact
+from src.qloo_mcp_server.get_insights import clean_response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def full_body(result: dict) -> bytes:
+    content = [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+    return envelope(content, result)
+
+
+def compact_body(result: dict, fields=None) -> bytes:
+    arguments = {"output": "compact", "fields": fields}
+    compact = compact_tool_result("get_insights", arguments, result)
+    return envelope([types.TextContent(type="text", text=dumps_compact(compact))], compact)
+
+
+def envelope(content: list, structured: dict) -> bytes:
+    result = types.CallToolResult(content=content, structuredContent=structured, isError=False)
+    response = types.JSONRPCResponse(jsonrpc="2.0", id=1, result=result.model_dump(by_alias=True, exclude_none=True))
+    return response.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def gzip_size(body: bytes, level: int) -> int:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return len(compressor.compress(body) + compressor.flush())
+
+
+def best(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fields", nargs="*", default=["name", "properties.description", "properties.image.url"])
+    args = parser.parse_args()
+
+    print(f"{'output':<22} {'take':>5} {'bytes':>9} {'gzip-6':>8} {'br-5':>8} {'serialize':>10} {'gzip':>8} {'br':>8}")
+    for take in (10, 50, 200):
+        result = {"ok": True, "data": clean_response(httpx.Response(200, content=insights_body(take)))}
+        number = max(1, 400 // take)
+        variants = [
+            ("full", lambda: full_body(result)),
+            ("compact", lambda: compact_body(result)),
+            ("compact + fields", lambda: compact_body(result, args.fields)),
+        ]
+        for name, render in variants:
+            body = render()
+            serialize = best(render, number, args.repeat)
+            gzip_ms = best(lambda: gzip_size(body, 6), number, args.repeat)
+            if brotli is not None:
+                br_size = f"{len(brotli.compress(body, quality=5)):>8}"
+                br_ms = f"{best(lambda: brotli.compress(body, quality=5), number, args.repeat):>6.2f}ms"
+            else:
+                br_size, br_ms = f"{'n/a':>8}", f"{'n/a':>8}"
+            print(f"{name:<22} {take:>5} {len(body):>9} {gzip_size(body, 6):>8} {br_size} "
+                  f"{serialize:>8.2f}ms {gzip_ms:>6.2f}ms {br_ms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Time and peak memory of response pruning, current vs the original pop-based cleaner.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prune --take 50 500 2000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import httpx
+
+from benchmarks.payloads import insights_body
+from src.qloo_mcp_server.get_insights import clean_response
+from src.qloo_mcp_server.prune import JSON_BACKEND
+
+KEYS_TO_REMOVE = [
+    "entity_id", "type", "subtype", "popularity", "tags", "query", "disambiguation", "external"
+]
+PROPERTIES_KEYS_TO_REMOVE = [
+    "format", "isbn10", "isbn13", "publication_year", "short_description", "short_descriptions",
+    "release_year", "content_rating", "akas", "keywords"
+]
+
+
+def legacy_clean_response(response: httpx.Response):
+    res_data = response.json()
+    for entity in res_data.get("results", {}).get("entities", []):
+        for key in KEYS_TO_REMOVE:
+            entity.pop(key, None)
+        props = entity.get("properties", {})
+        if isinstance(props, dict):
+            for prop_key in PROPERTIES_KEYS_TO_REMOVE:
+                props.pop(prop_key, None)
+    return res_data
+
+
+def measure(fn, body: bytes, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        response = httpx.Response(200, content=body)
+        start = time.perf_counter()
+        fn(response)
+        best = min(best, time.perf_counter() - start)
+
+    response = httpx.Response(200, content=body)
+    tracemalloc.start()
+    result = fn(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--take", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    print(f"{'take':>6} {'body KiB':>9} {'impl':>8} {'best ms':>9} {'peak KiB':>9}")
+    for take in args.take:
+        body = insights_body(take)
+        results = {}
+        for name, fn in (("legacy", legacy_clean_response), ("current", clean_response)):
+            best, peak, results[name] = measure(fn, body, args.repeat)
+            print(f"{take:>6} {len(body) / 1024:>9.0f} {name:>8} {best * 1000:>9.2f} {peak / 1024:>9.0f}")
+        assert json.dumps(results["legacy"], sort_keys=True) == json.dumps(results["current"], sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
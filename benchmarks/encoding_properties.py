@@ -0,0 +1,134 @@
+"""Property checks for utils.encode_form_query and query_key on random payloads.
+
+Every payload is encoded by the current encoder and by the reference encoder
+below (the implementation it replaced, without its unused helper), which must
+agree for lists, ``None``, numbers, booleans and arbitrary text. Canonical
+encoding must not depend on key order, and memoized encodings must not leak
+between values that compare equal (``1``, ``1.0``, ``True``).
+
+Run from the repository root:
+
+    python -m benchmarks.encoding_properties --payloads 5000
+"""
+import argparse
+import random
+import string
+import sys
+from typing import Any, Dict
+from urllib.parse import quote
+
+from src.qloo_mcp_server.utils import MEMO_MAX_LENGTH, encode_form_query, query_key
+
+KEYS = [
+    "filter.type", "filter.tags", "filter.release_year.min", "filter.location.query",
+    "filter.audience.types", "signal.interests.entities", "take", "page", "bias.trends",
+]
+TEXT = string.ascii_letters + string.digits + " ,:&=?/+%#~._-|\"'" + "éü中🎬"
+
+
+def reference_encode_form_query(data: Dict[str, Any], explode: bool = False) -> str:
+    query_params = []
+    for key, value in data.items():
+        if value is None:
+            continue
+        encoded_key = quote(key, safe="")
+
+        if isinstance(value, list):
+            if explode:
+                for v in value:
+                    query_params.append(f"{encoded_key}={quote(str(v), safe='')}")
+            else:
+                joined = ",".join(quote(str(v), safe="") for v in value)
+                query_params.append(f"{encoded_key}={joined}")
+        else:
+            encoded_value = quote(str(value), safe="")
+            query_params.append(f"{encoded_key}={encoded_value}")
+
+    return "&".join(query_params)
+
+
+def random_text(rng: random.Random) -> str:
+    # Some values are longer than the memo limit, they take the unmemoized path.
+    length = rng.choice([0, 1, 5, 20, 60, MEMO_MAX_LENGTH + 10])
+    return "".join(rng.choice(TEXT) for _ in range(length))
+
+
+def random_scalar(rng: random.Random) -> Any:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return rng.randint(-5, 3000)
+    if kind == 1:
+        return rng.choice([0.5, 4.5, 1.0, 1e-7, 2024.0])
+    if kind == 2:
+        return rng.choice([True, False])
+    if kind == 3:
+        return None
+    if kind == 4:
+        return f"urn:entity:{rng.choice(['movie', 'book', 'place'])}"
+    return random_text(rng)
+
+
+def random_payload(rng: random.Random) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {}
+    for _ in range(rng.randint(0, 8)):
+        key = rng.choice(KEYS) if rng.random() < 0.8 else random_text(rng)
+        if rng.random() < 0.3:
+            payload[key] = [random_scalar(rng) for _ in range(rng.randint(0, 4))]
+        else:
+            payload[key] = random_scalar(rng)
+    return payload
+
+
+def check(payloads: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    digests: Dict[str, str] = {}
+
+    def fail(message: str) -> None:
+        nonlocal failures
+        failures += 1
+        if failures <= 10:
+            print(f"FAIL {message}")
+
+    for _ in range(payloads):
+        payload = random_payload(rng)
+        for explode in (False, True):
+            expected = reference_encode_form_query(payload, explode=explode)
+            if encode_form_query(payload, explode=explode) != expected:
+                fail(f"differs from the reference (explode={explode}): {payload!r}")
+            canonical = encode_form_query(payload, explode=explode, canonical=True)
+            if canonical != reference_encode_form_query(dict(sorted(payload.items())), explode=explode):
+                fail(f"canonical form is not the sorted reference (explode={explode}): {payload!r}")
+
+        items = list(payload.items())
+        rng.shuffle(items)
+        canonical = encode_form_query(payload, canonical=True)
+        if encode_form_query(dict(items), canonical=True) != canonical:
+            fail(f"canonical form depends on key order: {payload!r}")
+        if query_key(encode_form_query(dict(items), canonical=True)) != query_key(canonical):
+            fail(f"query_key depends on key order: {payload!r}")
+        if digests.setdefault(query_key(canonical), canonical) != canonical:
+            fail(f"query_key collision: {canonical!r}")
+
+    for value, expected in ((1, "a=1"), (True, "a=True"), (1.0, "a=1.0"), ([1, True, 1.0], "a=1,True,1.0")):
+        if encode_form_query({"a": value}) != expected:
+            fail(f"memoized encoding leaked between equal values: {value!r}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check(args.payloads, args.seed)
+    if failures:
+        print(f"{failures} failures in {args.payloads} payloads")
+        return 1
+    print(f"PASS encode_form_query matches the reference on {args.payloads} payloads")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""End-to-end load test: the real server against the local mock QLOO API.
+
+Starts benchmarks/mock_qloo.py and the server (in dev mode, pointed at the mock
+through QLOO_API) as subprocesses, drives concurrent MCP tools/call traffic
+and reports throughput, latency percentiles and the server's peak RSS.
+
+Run from the repository root, anything after ``--`` is passed to the server:
+
+    python -m benchmarks.load_test --concurrency 32 --requests 2000 --latency 0.05
+    python -m benchmarks.load_test --distinct 1000 -- --workers 4 --shared-cache
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+ACCEPT = "application/json, text/event-stream"
+
+
+def tool_calls(args: argparse.Namespace) -> List[Dict]:
+    """The request mix, ``distinct`` variants of each tool so cache hit rates are controllable."""
+    # A filter each entity type accepts, the server rejects inapplicable ones locally.
+    entity_filters = [
+        ("urn:entity:movie", "filter.release_year.min"),
+        ("urn:entity:tv_show", "filter.release_year.min"),
+        ("urn:entity:book", "filter.publication_year.min"),
+        ("urn:entity:place", "filter.external.resy.count.min"),
+    ]
+    calls = []
+    for i in range(args.distinct):
+        if "get_insights" in args.tools:
+            entity_type, filter_name = entity_filters[i % len(entity_filters)]
+            calls.append({
+                "name": "get_insights",
+                "arguments": {
+                    "entity_type": entity_type,
+                    "filters": {"take": args.take, filter_name: 1900 + i},
+                },
+            })
+        if "get_audience_by_type" in args.tools:
+            calls.append({
+                "name": "get_audience_by_type",
+                "arguments": {"parent_type": f"urn:audience:hobbies_and_interests_{i}"},
+            })
+        if "find_audience" in args.tools:
+            calls.append({"name": "find_audience", "arguments": {"query": f"audience {i}"}})
+    if "get_audience_types" in args.tools:
+        calls.append({"name": "get_audience_types", "arguments": {}})
+    return calls
+
+
+def peak_rss_kib(pid: int) -> Optional[int]:
+    """VmHWM of the process and its children (workers), Linux only."""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1])
+        except OSError:
+            return None
+    return total
+
+
+async def wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def drive(url: str, calls: List[Dict], concurrency: int, total: int, seed: int):
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        async def worker() -> None:
+            nonlocal errors
+            while next(counter) < total:
+                call = rng.choice(calls)
+                body = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": call}
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json=body, headers={"Accept": ACCEPT})
+                    reply = response.json()
+                    failed = response.status_code != 200 or "error" in reply or reply["result"].get("isError")
+                    if not failed and isinstance(reply["result"].get("structuredContent"), dict):
+                        failed = not reply["result"]["structuredContent"].get("ok", True)
+                except (httpx.HTTPError, ValueError, KeyError):
+                    failed = True
+                latencies.append(time.perf_counter() - start)
+                errors += failed
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    server_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    argv = argv[: argv.index("--")] if "--" in argv else argv
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--distinct", type=int, default=20, help="Distinct queries per tool")
+    parser.add_argument("--tools", nargs="+", default=["get_insights", "get_audience_by_type", "get_audience_types"])
+    parser.add_argument("--take", type=int, default=20, help="Entities per get_insights response")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock QLOO API latency in seconds")
+    parser.add_argument("--audiences", type=int, default=200, help="Audiences per mock get_audience_by_type response")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    mock = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_qloo", "--port", str(args.mock_port),
+        "--latency", str(args.latency), "--audiences", str(args.audiences),
+    ])
+    env = dict(os.environ, QLOO_API=f"http://127.0.0.1:{args.mock_port}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.qloo_mcp_server", "--isDev", "--port", str(args.port), *server_args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.mock_port}/v2/audiences/types"))
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.port}/stats"))
+        latencies, errors, elapsed = asyncio.run(
+            drive(f"http://127.0.0.1:{args.port}/mcp/", tool_calls(args), args.concurrency, args.requests, args.seed)
+        )
+        rss = peak_rss_kib(server.pid)
+    finally:
+        server.terminate()
+        mock.terminate()
+        server.wait()
+        mock.wait()
+
+    latencies.sort()
+    print(f"requests:    {len(latencies)} ({errors} errors), concurrency {args.concurrency}")
+    print(f"throughput:  {len(latencies) / elapsed:,.1f} req/s")
+    print(f"latency ms:  p50 {percentile(latencies, 0.50) * 1000:.1f}  p95 {percentile(latencies, 0.95) * 1000:.1f}"
+          f"  p99 {percentile(latencies, 0.99) * 1000:.1f}  mean {statistics.fmean(latencies) * 1000:.1f}")
+    print(f"peak RSS:    {'n/a' if rss is None else f'{rss / 1024:.1f} MiB'}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
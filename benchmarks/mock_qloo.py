@@ -0,0 +1,111 @@
+"""Local stand-in for the QLOO API serving /v2/insights, /v2/audiences and /v2/audiences/types.
+
+Responses have the shape of the real API (see payloads.py), with configurable
+latency and size. Scripted faults are served, in order, before normal
+responses.
+
+Run from the repository root:
+
+    python -m benchmarks.mock_qloo --port 9000 --latency 0.05
+"""
+import argparse
+import asyncio
+import functools
+import random
+from typing import Any, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from benchmarks.payloads import audience_types_body, audiences_body, insights_body
+
+
+class MockQloo:
+    """``faults`` entries are dicts with optional ``status``, ``retry_after`` and ``delay`` (seconds)."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        audiences: int = 200,
+        faults: Optional[List[Dict[str, Any]]] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.audiences = audiences
+        self.faults = list(faults or [])
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.paths: List[str] = []
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route("/v2/insights", self.insights),
+            Route("/v2/audiences", self.audiences_by_type),
+            Route("/v2/audiences/types", self.audience_types),
+        ])
+
+    async def _respond(self, request: Request, body: bytes) -> Response:
+        self.requests += 1
+        self.paths.append(request.url.path)
+        fault = self.faults.pop(0) if self.faults else {}
+        delay = fault.get("delay", self.latency + self.jitter * self.rng.random())
+        if delay:
+            await asyncio.sleep(delay)
+        status = fault.get("status", 200)
+        if status != 200:
+            headers = {"Retry-After": str(fault["retry_after"])} if "retry_after" in fault else None
+            return Response(f'{{"error": "mock fault {status}"}}', status_code=status, headers=headers)
+        return Response(body, media_type="application/json")
+
+    async def insights(self, request: Request) -> Response:
+        take = int(request.query_params.get("take", 10))
+        page = int(request.query_params.get("page", 1))
+        return await self._respond(request, _insights(take, page))
+
+    async def audiences_by_type(self, request: Request) -> Response:
+        # ``audiences`` per type, all of them unless take/page ask for one page.
+        parent_type = request.query_params.get("filter.parents.types", "urn:audience:hobbies_and_interests")
+        take = int(request.query_params.get("take", self.audiences))
+        start = (int(request.query_params.get("page", 1)) - 1) * take
+        count = max(0, min(take, self.audiences - start))
+        return await self._respond(request, _audiences(count, parent_type, start))
+
+    async def audience_types(self, request: Request) -> Response:
+        return await self._respond(request, _audience_types())
+
+
+# Bodies are generated once per shape so the mock itself stays cheap under load.
+@functools.lru_cache(maxsize=64)
+def _insights(take: int, page: int) -> bytes:
+    return insights_body(take, seed=page)
+
+
+@functools.lru_cache(maxsize=256)
+def _audiences(count: int, parent_type: str, start: int) -> bytes:
+    return audiences_body(count, parent_type=parent_type, start=start)
+
+
+@functools.lru_cache(maxsize=1)
+def _audience_types() -> bytes:
+    return audience_types_body()
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many random extra seconds")
+    parser.add_argument("--audiences", type=int, default=200, help="Audiences returned per type")
+    args = parser.parse_args()
+    mock = MockQloo(latency=args.latency, jitter=args.jitter, audiences=args.audiences)
+    uvicorn.run(mock.app(), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
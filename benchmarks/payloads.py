@@ -0,0 +1,86 @@
+"""Synthetic QLOO API bodies shaped like real /v2/insights and /v2/audiences responses."""
+import json
+import random
+from typing import Any, Dict
+
+
+def insight_entity(i: int, rng: random.Random) -> Dict[str, Any]:
+    words = ["drama", "space", "crime", "romance", "noir", "comedy", "heist", "family"]
+    return {
+        "name": f"Entity {i}",
+        "entity_id": f"{i:032X}",
+        "type": "urn:entity",
+        "subtype": "urn:entity:movie",
+        "popularity": rng.random(),
+        "properties": {
+            "description": " ".join(rng.choice(words) for _ in range(40)),
+            "image": {"url": f"https://images.example.com/{i}.jpg"},
+            "release_date": "2001-05-04",
+            "duration": rng.randint(80, 180),
+            "format": "Hardcover",
+            "isbn10": "0000000000",
+            "isbn13": "0000000000000",
+            "publication_year": 2001,
+            "short_description": " ".join(rng.choice(words) for _ in range(15)),
+            "short_descriptions": [
+                {"value": " ".join(rng.choice(words) for _ in range(15)), "languages": ["en"]}
+                for _ in range(4)
+            ],
+            "release_year": 2001,
+            "content_rating": "PG-13",
+            "akas": [{"value": f"Alias {i}-{k}", "languages": ["en", "fr"]} for k in range(10)],
+            "keywords": [{"name": rng.choice(words), "count": rng.randint(1, 999)} for _ in range(30)],
+        },
+        "tags": [
+            {"id": f"urn:tag:genre:media:{rng.choice(words)}", "name": rng.choice(words), "type": "urn:tag:genre:media"}
+            for _ in range(40)
+        ],
+        "external": {
+            "imdb": [{"id": f"tt{i:07d}", "user_rating": 7.1, "user_rating_count": 1000}],
+            "metacritic": [{"id": f"m{i}", "critic_rating": 70, "user_rating": 7.0}],
+            "rottentomatoes": [{"id": f"rt{i}", "critic_rating": "90%", "user_rating": "85%"}],
+        },
+        "disambiguation": "2001 film",
+        "query": {"affinity": rng.random(), "measurements": {"audience_growth": rng.random()}},
+    }
+
+
+def insights_body(take: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    body = {"success": True, "results": {"entities": [insight_entity(i, rng) for i in range(take)]}}
+    return json.dumps(body).encode()
+
+
+AUDIENCE_WORDS = [
+    "outdoor", "vegan", "gamers", "millennials", "parents", "travelers", "investors", "students",
+    "fitness", "foodies", "retirees", "collectors", "music lovers", "pet owners", "commuters", "readers",
+]
+
+
+def audiences_body(count: int, seed: int = 0, parent_type: str = "urn:audience:hobbies_and_interests", start: int = 0) -> bytes:
+    """Audiences ``start`` to ``start + count`` of ``parent_type``."""
+    rng = random.Random(seed)
+    type_name = parent_type.rsplit(":", 1)[-1]
+    audiences = []
+    for i in range(start, start + count):
+        word = AUDIENCE_WORDS[i % len(AUDIENCE_WORDS)]
+        audiences.append({
+            "name": f"{word.title()} {i}",
+            "id": f"{parent_type}:{word.replace(' ', '_')}_{i}",
+            "entity_id": f"{i:032X}",
+            "parents": [parent_type],
+            "type": "urn:audience",
+            "disambiguation": type_name,
+            "tags": [{"id": f"urn:tag:{rng.randint(0, 99)}"} for _ in range(5)],
+        })
+    return json.dumps({"success": True, "results": {"audiences": audiences}}).encode()
+
+
+def audience_types_body() -> bytes:
+    names = [
+        "communities", "global_issues", "hobbies_and_interests", "investing_interests", "leisure",
+        "life_stage", "lifestyle_preferences_beliefs", "political_preferences", "professional_area",
+        "spending_habits",
+    ]
+    types = [{"id": f"urn:audience:{n}", "name": n.replace("_", " ").title(), "parents": []} for n in names]
+    return json.dumps({"success": True, "results": {"audience_types": types}}).encode()
@@ -0,0 +1,157 @@
+"""Replays retry, Retry-After, circuit breaker, hedging and rate limit scenarios
+against the in-process mock QLOO API and checks the upstream layer's behavior.
+
+Backoff sleeps are recorded instead of slept and jitter is fixed, so every run
+is deterministic. Run from the repository root:
+
+    python -m benchmarks.resilience_scenarios
+"""
+import asyncio
+import sys
+
+import httpx
+
+from benchmarks.mock_qloo import MockQloo
+from src.qloo_mcp_server.client import upstream_client
+from src.qloo_mcp_server.upstream import Upstream, UpstreamUnavailable
+
+URL = "http://mock-qloo/v2/insights"
+
+
+class RecordedSleep:
+    def __init__(self):
+        self.delays = []
+
+    async def __call__(self, delay: float) -> None:
+        self.delays.append(round(delay, 3))
+
+
+async def retries_with_backoff():
+    mock = MockQloo(faults=[{"status": 503}, {"status": 502}])
+    sleep = RecordedSleep()
+    upstream = Upstream(retries=2, backoff_base=0.25, sleep=sleep, rng=lambda: 1.0)
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        response = await upstream.get(URL, params="take=1")
+    assert response.status_code == 200, response.status_code
+    assert mock.requests == 3, mock.requests
+    assert sleep.delays == [0.25, 0.5], sleep.delays
+
+
+async def honors_retry_after():
+    mock = MockQloo(faults=[{"status": 429, "retry_after": 2}])
+    sleep = RecordedSleep()
+    upstream = Upstream(sleep=sleep, rng=lambda: 1.0)
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        response = await upstream.get(URL, params="take=1")
+    assert response.status_code == 200, response.status_code
+    assert sleep.delays == [2.0], sleep.delays
+
+
+async def gives_up_on_long_retry_after():
+    mock = MockQloo(faults=[{"status": 429, "retry_after": 120}])
+    sleep = RecordedSleep()
+    upstream = Upstream(max_retry_after=10, sleep=sleep)
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        response = await upstream.get(URL, params="take=1")
+    assert response.status_code == 429, response.status_code
+    assert mock.requests == 1 and not sleep.delays
+
+
+async def breaker_fails_fast():
+    mock = MockQloo(faults=[{"status": 500}] * 10)
+    upstream = Upstream(retries=0, breaker_threshold=3, breaker_reset=60, sleep=RecordedSleep())
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        for _ in range(3):
+            assert (await upstream.get(URL)).status_code == 500
+        try:
+            await upstream.get(URL)
+        except UpstreamUnavailable:
+            pass
+        else:
+            raise AssertionError("breaker did not open")
+    assert mock.requests == 3, mock.requests
+    assert upstream.breaker.state == "open"
+
+
+async def breaker_probe_closes():
+    mock = MockQloo(faults=[{"status": 500}])
+    upstream = Upstream(retries=0, breaker_threshold=1, breaker_reset=0, sleep=RecordedSleep())
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        assert (await upstream.get(URL)).status_code == 500
+        assert (await upstream.get(URL)).status_code == 200
+    assert upstream.breaker.state == "closed"
+
+
+async def breaker_cancelled_probe_released():
+    mock = MockQloo(faults=[{"status": 500}, {"delay": 1.0}])
+    upstream = Upstream(retries=0, breaker_threshold=1, breaker_reset=0, sleep=RecordedSleep())
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        assert (await upstream.get(URL)).status_code == 500
+        probe = asyncio.ensure_future(upstream.get(URL))
+        await asyncio.sleep(0.05)
+        assert upstream.breaker.probing
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        assert not upstream.breaker.probing
+        assert (await upstream.get(URL)).status_code == 200
+    assert upstream.breaker.state == "closed", upstream.breaker.state
+
+
+async def hedged_request_wins():
+    mock = MockQloo(faults=[{"delay": 1.0}])
+    upstream = Upstream(hedge_after=0.05)
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await upstream.get(URL, params="take=1")
+        elapsed = loop.time() - start
+    assert response.status_code == 200
+    assert upstream.hedged == 1 and upstream.hedge_wins == 1
+    assert elapsed < 0.5, elapsed
+
+
+async def rate_limited():
+    mock = MockQloo()
+    sleep = RecordedSleep()
+    upstream = Upstream(rate=10, burst=1, sleep=sleep)
+    now = [0.0]
+    upstream.limiter.clock = lambda: now[0]
+    upstream.limiter.updated = 0.0
+
+    async def advancing_sleep(delay: float) -> None:
+        await sleep(delay)
+        now[0] += delay
+
+    upstream.sleep = advancing_sleep
+    async with upstream_client(transport=httpx.ASGITransport(app=mock.app())):
+        for _ in range(3):
+            await upstream.get(URL)
+    assert sleep.delays == [0.1, 0.1], sleep.delays
+
+
+SCENARIOS = [
+    retries_with_backoff,
+    honors_retry_after,
+    gives_up_on_long_retry_after,
+    breaker_fails_fast,
+    breaker_probe_closes,
+    breaker_cancelled_probe_released,
+    hedged_request_wins,
+    rate_limited,
+]
+
+
+def main() -> int:
+    failed = 0
+    for scenario in SCENARIOS:
+        try:
+            asyncio.run(scenario())
+            print(f"PASS {scenario.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {scenario.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
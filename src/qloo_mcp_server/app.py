@@ -0,0 +1,249 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
+import mcp.types as types
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Mount, Route
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from src.qloo_mcp_server.get_insights import get_insights_batch, get_insights_by_entity_type, get_insights_paginated
+from src.qloo_mcp_server.catalog import ToolCatalog
+from src.qloo_mcp_server.compact import compact_tool_result, dumps_compact, tabulate, wants_compact
+from src.qloo_mcp_server.compression import CompressionMiddleware
+from src.qloo_mcp_server.client import upstream_client
+from src.qloo_mcp_server.upstream import configure_upstream, get_upstream
+from src.qloo_mcp_server.cache import configure_cache, get_cache
+from src.qloo_mcp_server.audience_index import configure_audience_index
+from src.qloo_mcp_server.filter_schema import configure_filter_validator
+from src.qloo_mcp_server.offload import configure_offloader
+from src.qloo_mcp_server.prefetch import configure_prefetcher
+from src.qloo_mcp_server.metrics import REGISTRY, track_tool
+from src.qloo_mcp_server.settings import ServerSettings
+from src.qloo_mcp_server.shared_cache import SharedCacheClient
+from src.qloo_mcp_server.startup import get_startup_profile
+from src.qloo_mcp_server.tenants import UnknownTenant, configure_tenants, load_tenants_file
+
+
+def create_app(settings: ServerSettings) -> Starlette:
+    shared = None
+    if settings.shared_cache and settings.shared_cache_path:
+        shared = SharedCacheClient(settings.shared_cache_path)
+    configure_cache(
+        maxsize=settings.cache_size,
+        ttls={
+            "get_insights": settings.insights_ttl,
+            "get_audience_types": settings.audience_types_ttl,
+            "get_audience_by_type": settings.audience_ttl,
+        },
+        shared=shared,
+        namespace_maxsize=settings.tenant_cache_size,
+    )
+
+    # get_audience_types/get_audience_by_type are served from the index while it is
+    # at most two refresh intervals old, so one failed refresh does not drop it.
+    audience_index = configure_audience_index(
+        max_age=2 * settings.audience_index_refresh if settings.audience_index_refresh > 0 else settings.audience_ttl
+    )
+
+    # Nothing it fetches could be kept without a cache.
+    prefetcher = configure_prefetcher(
+        budget=settings.prefetch_budget if settings.cache_size > 0 else 0, min_hits=settings.prefetch_min_hits
+    )
+
+    offloader = configure_offloader(
+        mode=settings.offload,
+        workers=settings.offload_workers,
+        threshold=settings.offload_threshold,
+        max_queue=settings.offload_queue,
+    )
+
+    upstream_options = {
+        "retries": settings.retries,
+        "hedge_after": settings.hedge_after,
+        "breaker_threshold": settings.breaker_threshold,
+        "breaker_reset": settings.breaker_reset,
+    }
+    configure_upstream(rate=settings.rate_limit, **upstream_options)
+    # Keys other than the server's own get a pool, limiter and breaker of their own.
+    tenants = configure_tenants(
+        tokens=load_tenants_file(settings.tenants_file) if settings.tenants_file else None,
+        allow_client_keys=settings.allow_client_keys,
+        max_pools=settings.tenant_pools,
+        client_options={
+            "max_connections": settings.tenant_max_connections,
+            "max_keepalive_connections": min(settings.max_keepalive, settings.tenant_max_connections),
+            "http2": settings.http2,
+        },
+        upstream_options={"rate": settings.tenant_rate_limit, **upstream_options},
+    )
+
+    # Built and validated once, list_tools hands out the same objects on every request.
+    catalog = ToolCatalog.load()
+    configure_filter_validator(catalog.by_name["get_insights"].inputSchema)
+
+    app = Server("qloo-mcp-server")
+
+    # Arguments are checked against the catalog's precompiled validators instead.
+    @app.call_tool(validate_input=False)
+    async def qloo_tool(name: str, arguments: dict):
+        with track_tool(name if name in catalog.by_name else "unknown") as tracker:
+            error = catalog.validate_arguments(name, arguments)
+            result = {"ok": False, "error": error} if error else await call_tool_as_tenant(name, arguments)
+            tracker.record(result)
+        if wants_compact(name, arguments):
+            # Returned as (content, structuredContent) so the text is not re-serialized with indentation.
+            result = compact_tool_result(name, arguments, result)
+            return [types.TextContent(type="text", text=dumps_compact(result))], result
+        return result
+
+    async def call_tool_as_tenant(name: str, arguments: dict):
+        request = app.request_context.request
+        try:
+            tenant = tenants.resolve(request.headers if request is not None else {})
+        except UnknownTenant as e:
+            return {"ok": False, "error": str(e)}
+        with tenants.use(tenant):
+            return await call_tool(name, arguments)
+
+    async def call_tool(name: str, arguments: dict):
+        
+        if name == "get_insights" and arguments.get("max_results"):
+            return await get_insights_paginated(
+                entity_type=arguments["entity_type"],
+                filters=arguments["filters"],
+                max_results=arguments["max_results"],
+                page_size=arguments.get("page_size", 50),
+                on_page=page_streamer(arguments) if settings.sse else None,
+            )
+        elif name == "get_insights":
+            return await get_insights_by_entity_type(entity_type = arguments["entity_type"], filters=arguments["filters"])
+            # return get_insights(arguments["payload"])
+        elif name == "get_insights_batch":
+            return await get_insights_batch(arguments["items"], max_concurrency=settings.batch_concurrency)
+        elif name == "get_audience_types":
+            from src.qloo_mcp_server.get_audience import get_audience_types
+            return await get_audience_types()
+        elif name == "get_audience_by_type":
+            from src.qloo_mcp_server.get_audience import get_audience_by_type
+            return await get_audience_by_type(parent_type=arguments["parent_type"])
+        elif name == "find_audience":
+            from src.qloo_mcp_server.get_audience import find_audience
+            return await find_audience(
+                query=arguments["query"],
+                parent_type=arguments.get("parent_type"),
+                limit=arguments.get("limit", 10),
+            )
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+
+    def page_streamer(arguments: dict):
+        compact = arguments.get("output") == "compact"
+
+        async def stream_page(page: int, entities: list, received: int) -> None:
+            await send_page(page, tabulate(entities, arguments.get("fields")) if compact else entities, received)
+
+        return stream_page
+
+    async def send_page(page: int, entities, received: int) -> None:
+        ctx = app.request_context
+        await ctx.session.send_log_message(
+            level="info",
+            data={"page": page, "entities": entities},
+            logger="get_insights",
+            related_request_id=ctx.request_id,
+        )
+        if ctx.meta is not None and ctx.meta.progressToken is not None:
+            await ctx.session.send_progress_notification(
+                ctx.meta.progressToken, progress=received, related_request_id=ctx.request_id
+            )
+
+    @app.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        return catalog.tools
+
+    # Create the session manager with true stateless mode
+    session_manager = StreamableHTTPSessionManager(
+        app=app,
+        event_store=None,
+        json_response=not settings.sse,
+        stateless=True,
+    )
+
+    async def handle_streamable_http(
+        scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        await session_manager.handle_request(scope, receive, send)
+
+    async def handle_stats(request: Request) -> JSONResponse:
+        return JSONResponse({
+            "cache": get_cache().stats(),
+            "upstream": get_upstream().stats(),
+            "tenants": tenants.stats(),
+            "audience_index": audience_index.stats(),
+            "offload": offloader.stats(),
+            "prefetch": prefetcher.stats(),
+            "startup": get_startup_profile().stats(),
+        })
+
+    async def handle_metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        """Context manager for session manager and the pooled QLOO API client."""
+        async with session_manager.run(), upstream_client(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive,
+            http2=settings.http2,
+        ):
+            print("Application started with StreamableHTTP session manager!")
+            get_startup_profile().ready()
+            index_task = None
+            if settings.audience_index_refresh > 0 and tenants.default.api_key:
+                from src.qloo_mcp_server.get_audience import run_audience_index
+                index_task = asyncio.create_task(run_audience_index(settings.audience_index_refresh))
+            prefetch_task = None
+            if prefetcher.enabled:
+                # Imported for its refresher, get_audience is otherwise only imported on first use.
+                import src.qloo_mcp_server.get_audience  # noqa: F401
+
+                if settings.warm_set_path:
+                    prefetcher.load(settings.warm_set_path)
+                prefetch_task = asyncio.create_task(prefetcher.run(settings.warm_set_path))
+            try:
+                yield
+            finally:
+                print("Application shutting down...")
+                if index_task is not None:
+                    index_task.cancel()
+                if prefetch_task is not None:
+                    prefetch_task.cancel()
+                    if settings.warm_set_path:
+                        await prefetcher.save(settings.warm_set_path)
+                offloader.close()
+                await tenants.close()
+                if shared is not None:
+                    await shared.close()
+
+    # Create an ASGI application using the transport
+    starlette_app = Starlette(
+        debug=True,
+        routes=[
+            Mount("/mcp", app=handle_streamable_http),
+            Route("/stats", endpoint=handle_stats),
+            Route("/metrics", endpoint=handle_metrics),
+        ],
+        lifespan=lifespan,
+        middleware=(
+            [Middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)]
+            if settings.compression else []
+        ),
+    )
+
+    return starlette_app
@@ -0,0 +1,156 @@
+import heapq
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+MIN_SCORE = 0.3
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class _Entry:
+    id: str
+    name: str
+    kind: str
+    parent_type: Optional[str]
+    name_text: str
+    text: str
+    grams: FrozenSet[str]
+
+
+class AudienceIndex:
+    """In-memory copy of the audience taxonomy (types -> audiences).
+
+    Holds the tool results of get_audience_types / get_audience_by_type for
+    serving them locally while fresh, and a trigram index for resolving names
+    or partial strings to ``urn:audience:...`` ids without calling the QLOO API.
+    """
+
+    def __init__(self, max_age: float = 7200.0):
+        self.max_age = max_age
+        self.refreshed_at: Optional[float] = None
+        self._types_result: Optional[Dict[str, Any]] = None
+        self._by_type_results: Dict[str, Dict[str, Any]] = {}
+        self._entries: List[_Entry] = []
+        self._grams: Dict[str, List[int]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def age(self) -> Optional[float]:
+        return None if self.refreshed_at is None else time.monotonic() - self.refreshed_at
+
+    def is_fresh(self) -> bool:
+        age = self.age()
+        return age is not None and age <= self.max_age
+
+    def load(
+        self,
+        types_result: Dict[str, Any],
+        by_type_results: Dict[str, Dict[str, Any]],
+        audience_types: List[Dict[str, Any]],
+        audiences: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        """Replace the whole index, ``audiences`` maps a type id to its raw audiences."""
+        entries = [
+            self._entry(item, "audience_type", None) for item in audience_types
+        ] + [
+            self._entry(item, "audience", parent_type) for parent_type, items in audiences.items() for item in items
+        ]
+        entries = [entry for entry in entries if entry is not None]
+        grams: Dict[str, List[int]] = {}
+        for position, entry in enumerate(entries):
+            for gram in entry.grams:
+                grams.setdefault(gram, []).append(position)
+
+        # Swapped in one step so lookups never see a half-built index.
+        self._types_result = types_result
+        self._by_type_results = by_type_results
+        self._entries, self._grams = entries, grams
+        self.refreshed_at = time.monotonic()
+
+    @staticmethod
+    def _entry(item: Dict[str, Any], kind: str, parent_type: Optional[str]) -> Optional[_Entry]:
+        audience_id, name = item.get("id"), item.get("name")
+        if not isinstance(audience_id, str) or not isinstance(name, str):
+            return None
+        # The last id segment is searchable too, e.g. "millennials" in urn:audience:life_stage:millennials.
+        name_text = _normalize(name)
+        text = _normalize(f"{name} {audience_id.rsplit(':', 1)[-1].replace('_', ' ')}")
+        return _Entry(audience_id, name, kind, parent_type, name_text, text, _trigrams(text))
+
+    def types_result(self) -> Optional[Dict[str, Any]]:
+        return self._types_result if self.is_fresh() else None
+
+    def by_type_result(self, parent_type: str) -> Optional[Dict[str, Any]]:
+        return self._by_type_results.get(parent_type) if self.is_fresh() else None
+
+    def lookup(self, query: str, parent_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        normalized = _normalize(query)
+        if not normalized:
+            return []
+        query_grams = _trigrams(normalized)
+        shared = Counter()
+        for gram in query_grams:
+            for position in self._grams.get(gram, ()):
+                shared[position] += 1
+
+        scored = []
+        for position, count in shared.items():
+            entry = self._entries[position]
+            if parent_type and entry.parent_type != parent_type and entry.id != parent_type:
+                continue
+            score = count / (len(query_grams) + len(entry.grams) - count)
+            if entry.name_text == normalized or entry.text == normalized:
+                score = 1.0
+            elif f" {entry.text}".find(f" {normalized}") != -1:
+                # Prefix of the name or of one of its words.
+                score = max(score, 0.9)
+            if score >= MIN_SCORE:
+                # Ties go to the shorter name, then to the order the API listed them in.
+                scored.append((score, -len(entry.text), -position))
+
+        matches = []
+        for score, _, position in heapq.nlargest(limit, scored):
+            entry = self._entries[-position]
+            matches.append({
+                "id": entry.id,
+                "name": entry.name,
+                "kind": entry.kind,
+                "parent_type": entry.parent_type,
+                "score": round(score, 3),
+            })
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "fresh": self.is_fresh(),
+            "age": self.age(),
+            "types": len(self._by_type_results),
+            "entries": len(self._entries),
+        }
+
+
+_index = AudienceIndex()
+
+
+def get_audience_index() -> AudienceIndex:
+    return _index
+
+
+def configure_audience_index(max_age: float) -> AudienceIndex:
+    global _index
+    _index = AudienceIndex(max_age=max_age)
+    return _index
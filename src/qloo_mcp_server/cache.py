@@ -0,0 +1,233 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.qloo_mcp_server.shared_cache import SharedCacheClient
+
+DEFAULT_TTLS = {
+    "get_insights": 300.0,
+    "get_audience_types": 3600.0,
+    "get_audience_by_type": 3600.0,
+}
+
+
+class ResponseCache:
+    """In-process TTL + LRU cache for successful tool results.
+
+    Entries are keyed on (tool, normalized query string). Concurrent misses for
+    the same key share a single upstream fetch. Only ``{"ok": True}`` results are
+    stored, and cached values are shared between callers so they must not be
+    mutated. With a ``shared`` client, local misses are looked up in, and
+    fetched results written to, the cross-worker cache before the QLOO API is
+    called.
+
+    Tenants pass a ``namespace``, their entries are kept apart from everyone
+    else's (locally and in the shared cache) and, with ``namespace_maxsize``,
+    a namespace over its quota evicts its own least recently used entries
+    rather than other tenants'. The default namespace ``""`` has no quota.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        shared: Optional["SharedCacheClient"] = None,
+        namespace_maxsize: int = 0,
+    ):
+        self.maxsize = maxsize
+        self.namespace_maxsize = namespace_maxsize
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task[Tuple[Dict[str, Any], float]]"] = {}
+        # Per namespace, its keys in LRU order.
+        self._namespaces: Dict[str, "OrderedDict[Tuple[str, str], None]"] = {}
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.quota_evictions = 0
+
+    @staticmethod
+    def _key(key: str, namespace: str) -> str:
+        return f"{namespace}|{key}" if namespace else key
+
+    def get_entry(self, tool: str, key: str, namespace: str = "") -> Optional[Tuple[Dict[str, Any], float]]:
+        """The cached value and its remaining TTL in seconds."""
+        cache_key = (tool, self._key(key, namespace))
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            self._remove(cache_key, namespace)
+            return None
+        self._entries.move_to_end(cache_key)
+        if namespace:
+            self._namespaces[namespace].move_to_end(cache_key)
+        return value, remaining
+
+    def peek(self, tool: str, key: str, namespace: str = "") -> Optional[Tuple[Dict[str, Any], float]]:
+        """Like ``get_entry``, but neither refreshes the entry's LRU position nor drops it when expired."""
+        entry = self._entries.get((tool, self._key(key, namespace)))
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1], entry[0] - time.monotonic()
+
+    def get(self, tool: str, key: str, namespace: str = "") -> Optional[Dict[str, Any]]:
+        entry = self.get_entry(tool, key, namespace)
+        return None if entry is None else entry[0]
+
+    def set(
+        self, tool: str, key: str, value: Dict[str, Any], ttl: Optional[float] = None, namespace: str = ""
+    ) -> None:
+        if ttl is None:
+            ttl = self.ttls.get(tool, 0)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        cache_key = (tool, self._key(key, namespace))
+        self._entries[cache_key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(cache_key)
+        if namespace:
+            keys = self._namespaces.setdefault(namespace, OrderedDict())
+            keys[cache_key] = None
+            keys.move_to_end(cache_key)
+            while self.namespace_maxsize > 0 and len(keys) > self.namespace_maxsize:
+                self._remove(next(iter(keys)), namespace)
+                self.quota_evictions += 1
+        while len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._forget(evicted)
+            self.evictions += 1
+
+    def _remove(self, cache_key: Tuple[str, str], namespace: str) -> None:
+        del self._entries[cache_key]
+        if namespace:
+            self._forget(cache_key, namespace)
+
+    def _forget(self, cache_key: Tuple[str, str], namespace: Optional[str] = None) -> None:
+        if namespace is None:
+            namespace, sep, _ = cache_key[1].partition("|")
+            if not sep:
+                return
+        keys = self._namespaces.get(namespace)
+        if keys is not None:
+            keys.pop(cache_key, None)
+            if not keys:
+                del self._namespaces[namespace]
+
+    async def get_or_fetch(
+        self, tool: str, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], namespace: str = ""
+    ) -> Dict[str, Any]:
+        if self.ttls.get(tool, 0) <= 0:
+            return await fetch()
+
+        value = self.get(tool, key, namespace)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        cache_key = (tool, self._key(key, namespace))
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self.coalesced += 1
+            result, _ = await asyncio.shield(task)
+            return result
+
+        self.misses += 1
+        # Shielded so a cancelled caller does not cancel the fetch other callers are waiting on.
+        result, _ = await asyncio.shield(self._start(tool, key, namespace, fetch, use_shared=True))
+        return result
+
+    async def refresh(
+        self, tool: str, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], namespace: str = ""
+    ) -> Dict[str, Any]:
+        """Fetch a result again whether or not it is cached, e.g. before the cached one expires.
+
+        The shared cache is written but not read, its copy may be just as old.
+        Callers missing the key meanwhile wait for this fetch.
+        """
+        task = self._inflight.get((tool, self._key(key, namespace)))
+        if task is None:
+            task = self._start(tool, key, namespace, fetch, use_shared=False)
+        result, _ = await asyncio.shield(task)
+        return result
+
+    def _start(
+        self, tool: str, key: str, namespace: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], use_shared: bool
+    ) -> "asyncio.Task[Tuple[Dict[str, Any], float]]":
+        cache_key = (tool, self._key(key, namespace))
+        task = asyncio.ensure_future(self._load(tool, key, namespace, fetch, use_shared))
+        self._inflight[cache_key] = task
+
+        def _done(t: "asyncio.Task[Tuple[Dict[str, Any], float]]") -> None:
+            self._inflight.pop(cache_key, None)
+            if not t.cancelled() and t.exception() is None:
+                result, ttl = t.result()
+                if isinstance(result, dict) and result.get("ok"):
+                    self.set(tool, key, result, ttl, namespace)
+
+        task.add_done_callback(_done)
+        return task
+
+    async def _load(
+        self,
+        tool: str,
+        key: str,
+        namespace: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        use_shared: bool = True,
+    ) -> Tuple[Dict[str, Any], float]:
+        if self.shared is not None and use_shared:
+            found = await self.shared.get(tool, key, namespace)
+            if found is not None:
+                self.shared_hits += 1
+                return found
+
+        result = await fetch()
+        ttl = self.ttls.get(tool, 0)
+        if self.shared is not None and isinstance(result, dict) and result.get("ok"):
+            await self.shared.set(tool, key, result, ttl, namespace)
+        return result, ttl
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._namespaces.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "quota_evictions": self.quota_evictions,
+            "namespaces": len(self._namespaces),
+            "namespace_maxsize": self.namespace_maxsize,
+            "inflight": len(self._inflight),
+            "shared": None if self.shared is None else self.shared.stats(),
+        }
+
+
+_cache = ResponseCache()
+
+
+def get_cache() -> ResponseCache:
+    return _cache
+
+
+def configure_cache(
+    maxsize: int,
+    ttls: Dict[str, float],
+    shared: Optional["SharedCacheClient"] = None,
+    namespace_maxsize: int = 0,
+) -> ResponseCache:
+    global _cache
+    _cache = ResponseCache(maxsize=maxsize, ttls=ttls, shared=shared, namespace_maxsize=namespace_maxsize)
+    return _cache
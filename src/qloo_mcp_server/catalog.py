@@ -0,0 +1,56 @@
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+import jsonschema
+import mcp.types as types
+
+CATALOG_PATH = Path(__file__).with_name("tools.json")
+
+
+def _resolve_tool_refs(node: Any, schemas: Dict[str, Dict[str, Any]]) -> Any:
+    # {"$tool": "<name>"} stands for the inputSchema of an earlier tool in the file.
+    if isinstance(node, dict):
+        if set(node) == {"$tool"}:
+            return copy.deepcopy(schemas[node["$tool"]])
+        return {key: _resolve_tool_refs(value, schemas) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_resolve_tool_refs(value, schemas) for value in node]
+    return node
+
+
+class ToolCatalog:
+    """The tools served by list_tools, built and validated once at startup."""
+
+    def __init__(self, tools: List[types.Tool]):
+        self.tools = tools
+        self.by_name = {tool.name: tool for tool in tools}
+        # jsonschema.validate() re-checks and rebuilds the validator on every call
+        # (~20ms for get_insights), these are compiled once.
+        self.validators = {tool.name: jsonschema.Draft202012Validator(tool.inputSchema) for tool in tools}
+
+    def validate_arguments(self, name: str, arguments: Mapping[str, Any]) -> Optional[str]:
+        """Return the first input validation error for a known tool, ``None`` if valid."""
+        validator = self.validators.get(name)
+        if validator is None:
+            return None
+        error = jsonschema.exceptions.best_match(validator.iter_errors(arguments))
+        return None if error is None else f"Input validation error: {error.message}"
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = CATALOG_PATH) -> "ToolCatalog":
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+
+        schemas: Dict[str, Dict[str, Any]] = {}
+        tools = []
+        for entry in raw["tools"]:
+            entry = _resolve_tool_refs(entry, schemas)
+            jsonschema.Draft202012Validator.check_schema(entry["inputSchema"])
+            tool = types.Tool.model_validate(entry)
+            if tool.name in schemas:
+                raise ValueError(f"Duplicate tool in catalog: {tool.name}")
+            schemas[tool.name] = tool.inputSchema
+            tools.append(tool)
+        return cls(tools)
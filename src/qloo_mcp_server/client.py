@@ -0,0 +1,62 @@
+import contextlib
+import importlib.util
+import sys
+from collections.abc import AsyncIterator
+from typing import Any, Dict, Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("Upstream client is not running, it is started in the server lifespan")
+    return _client
+
+
+def pool_stats(client: Optional[httpx.AsyncClient] = None) -> Optional[Dict[str, int]]:
+    """Active and idle connections of ``client``, by default the shared one."""
+    client = client or _client
+    if client is None:
+        return None
+    # httpx keeps its httpcore pool private, report nothing if that ever changes.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return None
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {"active": len(connections) - idle, "idle": idle}
+
+
+def make_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    timeout: float = 30.0,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """A pooled client for the QLOO API, the caller closes it."""
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1", file=sys.stderr)
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(timeout=timeout, limits=limits, http2=http2, transport=transport)
+
+
+@contextlib.asynccontextmanager
+async def upstream_client(**options: Any) -> AsyncIterator[httpx.AsyncClient]:
+    """Shared pooled client for the QLOO API, one per process. Takes ``make_client`` options."""
+    global _client
+    async with make_client(**options) as client:
+        _client = client
+        try:
+            yield client
+        finally:
+            _client = None
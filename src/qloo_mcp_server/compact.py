@@ -0,0 +1,89 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Lists of objects rendered as tables in compact output, wherever they appear
+# in a tool result (under data.results for QLOO API bodies, under data for find_audience).
+TABLE_KEYS = frozenset(["entities", "audiences", "audience_types", "matches"])
+
+
+def flatten(obj: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Nested objects become dotted keys, e.g. ``properties.image.url``, lists are kept as values."""
+    if out is None:
+        out = {}
+    for key, value in obj.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flatten(value, f"{name}.", out)
+        else:
+            out[name] = value
+    return out
+
+
+def _selected(column: str, fields: Sequence[str]) -> bool:
+    return any(column == field or column.startswith(f"{field}.") for field in fields)
+
+
+def tabulate(items: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Render objects as ``{"columns": [...], "rows": [[...], ...]}``, every key is emitted once.
+
+    ``fields`` keeps only these columns, a field also selects the columns
+    nested under it (``properties`` keeps ``properties.description``, ...).
+    Missing values are ``null``.
+    """
+    flat = [flatten(item) for item in items]
+    columns: Dict[str, None] = {}
+    for item in flat:
+        columns.update(dict.fromkeys(item))
+    names = [column for column in columns if not fields or _selected(column, fields)]
+    return {"columns": names, "rows": [[item.get(column) for column in names] for item in flat]}
+
+
+def _compact(node: Any, fields: Optional[Sequence[str]]) -> Any:
+    if not isinstance(node, dict):
+        return node
+    out = {}
+    for key, value in node.items():
+        if key in TABLE_KEYS and isinstance(value, list) and all(isinstance(item, dict) for item in value):
+            out[key] = tabulate(value, fields)
+        elif key in ("data", "results"):
+            out[key] = _compact(value, fields)
+        else:
+            out[key] = value
+    return out
+
+
+def compact_result(result: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A tool result with its entity, audience and match lists rendered by ``tabulate``.
+
+    The result is rebuilt along the way, cached results are never modified.
+    """
+    return _compact(result, fields)
+
+
+def compact_tool_result(name: str, arguments: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the ``output``/``fields`` arguments of a tool call to its result."""
+    if name == "get_insights_batch" and isinstance(result.get("results"), list):
+        items = arguments.get("items") or []
+        results: List[Any] = []
+        for position, item_result in enumerate(result["results"]):
+            item = items[position] if position < len(items) and isinstance(items[position], dict) else {}
+            output = item.get("output", arguments.get("output", "full"))
+            fields = item.get("fields", arguments.get("fields"))
+            results.append(compact_result(item_result, fields) if output == "compact" else item_result)
+        return {**result, "results": results}
+    if arguments.get("output") == "compact":
+        return compact_result(result, arguments.get("fields"))
+    return result
+
+
+def wants_compact(name: str, arguments: Dict[str, Any]) -> bool:
+    if arguments.get("output") == "compact":
+        return True
+    return name == "get_insights_batch" and any(
+        isinstance(item, dict) and item.get("output") == "compact" for item in arguments.get("items") or []
+    )
+
+
+def dumps_compact(result: Dict[str, Any]) -> str:
+    """Text content for compact results: no indentation and no escaping of non-ASCII text."""
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,144 @@
+import zlib
+from typing import Callable, Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.qloo_mcp_server.metrics import REGISTRY, Counter
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, see the "brotli" extra
+    brotli = None
+
+RESPONSE_BYTES = REGISTRY.register(
+    Counter(
+        "qloo_mcp_http_response_bytes_total",
+        "HTTP response body bytes before (identity) and after compression, by content encoding.",
+        ["encoding"],
+    )
+)
+
+# Streams are left alone: every event would have to be flushed on its own.
+EXCLUDED_CONTENT_TYPES = frozenset(["text/event-stream"])
+# Bodies this large are compressed in a worker thread instead of on the event loop.
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """The client's preferred encoding of ``available`` (ties go to the order of ``available``)."""
+    preferences = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        preferences[name.strip()] = quality
+    best = None
+    for encoding in available:
+        quality = preferences.get(encoding, preferences.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return None if best is None else best[0]
+
+
+def _compressor(encoding: str, gzip_level: int, brotli_quality: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes], Callable[[], bytes]]:
+    """``(compress, flush, finish)`` for one response body."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class CompressionMiddleware:
+    """Compresses HTTP responses with br (when the brotli package is installed) or gzip.
+
+    Bodies under ``minimum_size`` bytes, responses that already have a
+    Content-Encoding and server-sent event streams are sent as they are.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponse(self, encoding, send).run(scope, receive)
+
+
+class _CompressingResponse:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compress: Optional[Tuple[Callable[[bytes], bytes], ...]] = None
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_message)
+
+    async def send_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = "content-encoding" in headers or media_type in EXCLUDED_CONTENT_TYPES
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            headers["Content-Encoding"] = self.encoding
+            self.compress = _compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            compressed = await self._compress(body, more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(start)
+        else:
+            compressed = await self._compress(body, more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    async def _compress(self, body: bytes, more_body: bool) -> bytes:
+        RESPONSE_BYTES.inc("identity", amount=len(body))
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            compressed = await anyio.to_thread.run_sync(self._compress_sync, body, more_body)
+        else:
+            compressed = self._compress_sync(body, more_body)
+        RESPONSE_BYTES.inc(self.encoding, amount=len(compressed))
+        return compressed
+
+    def _compress_sync(self, body: bytes, more_body: bool) -> bytes:
+        compress, flush, finish = self.compress
+        return compress(body) + (flush() if more_body else finish())
@@ -1,2 +1,5 @@
-QLOO_API = "https://hackathon.api.qloo.com"
-QLOO_API_KEY = "2J9AxHoGlC1KzXwVmrenLdXybLs4dLe22iIkSPzOrDs"
\ No newline at end of file
+import os
+
+# QLOO_API can be pointed elsewhere, e.g. at benchmarks/mock_qloo.py for load tests.
+QLOO_API = os.environ.get("QLOO_API", "https://hackathon.api.qloo.com")
+QLOO_API_KEY = "2J9AxHoGlC1KzXwVmrenLdXybLs4dLe22iIkSPzOrDs"
@@ -0,0 +1,184 @@
+import datetime
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+# Parsed from the filter descriptions in tools.json, e.g. "... (1-4). Available to: Place, Destination".
+_AVAILABLE_TO = re.compile(r"Available to:\s*(.+?)\s*\.?\s*$")
+_RANGE = re.compile(r"\((-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\)")
+_ENTITY_TYPE = re.compile(r"urn:entity:[a-z_]+")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Bounds of a range filter, checked against each other when both are given.
+_BOUND_PAIRS = ((".min", ".max"), (".from", ".to"))
+
+
+@dataclass(frozen=True)
+class FilterRule:
+    """What one ``filter.*`` parameter accepts, ``entity_types=None`` means every entity type."""
+
+    name: str
+    type: str
+    entity_types: Optional[FrozenSet[str]] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    date: bool = False
+
+    @classmethod
+    def from_schema(cls, name: str, schema: Mapping[str, Any]) -> "FilterRule":
+        description = schema.get("description", "")
+        entity_types = None
+        available = _AVAILABLE_TO.search(description)
+        if available:
+            entity_types = frozenset(
+                "urn:entity:" + label.strip().lower().replace(" ", "_") for label in available.group(1).split(",")
+            )
+        bounds = _RANGE.search(description)
+        return cls(
+            name=name,
+            type=schema.get("type", "string"),
+            entity_types=entity_types,
+            minimum=float(bounds.group(1)) if bounds else None,
+            maximum=float(bounds.group(2)) if bounds else None,
+            date="(YYYY-MM-DD)" in description,
+        )
+
+    def compile(self) -> Callable[[Any], Any]:
+        """A function returning the normalized value, or raising ``ValueError``."""
+        name, minimum, maximum = self.name, self.minimum, self.maximum
+
+        def check_range(value: Any) -> Any:
+            if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+                raise ValueError(f"{name} must be between {minimum:g} and {maximum:g}")
+            return value
+
+        if self.type == "integer":
+            def normalize(value: Any) -> Any:
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                if not isinstance(value, int) or isinstance(value, bool):
+                    raise ValueError(f"{name} must be an integer")
+                return check_range(value)
+        elif self.type == "number":
+            def normalize(value: Any) -> Any:
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    raise ValueError(f"{name} must be a number")
+                # 2000 and 2000.0 are the same query.
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                return check_range(value)
+        elif self.date:
+            def normalize(value: Any) -> Any:
+                value = value.strip() if isinstance(value, str) else value
+                try:
+                    if not isinstance(value, str) or not _DATE.match(value):
+                        raise ValueError
+                    datetime.date.fromisoformat(value)
+                except ValueError:
+                    raise ValueError(f"{name} must be a date formatted as YYYY-MM-DD") from None
+                return value
+        else:
+            def normalize(value: Any) -> Any:
+                # Lists and numbers only come from direct Python callers, the tool schema accepts strings.
+                if isinstance(value, list):
+                    value = ",".join(str(item).strip() for item in value)
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    value = str(value)
+                if not isinstance(value, str) or not value.strip():
+                    raise ValueError(f"{name} must be a non-empty string")
+                return value.strip()
+
+        return normalize
+
+
+class InsightsFilterValidator:
+    """Per-entity-type checks of get_insights filters, compiled once from the tool schema.
+
+    Filters the schema knows about are type and range checked, normalized,
+    and rejected on entity types they are not available to. Parameters the
+    schema does not describe (``take``, ``signal.*``, ...) pass through as is.
+    """
+
+    def __init__(self, entity_types: FrozenSet[str], rules: Mapping[str, FilterRule]):
+        self.entity_types = entity_types
+        self.rules = dict(rules)
+        self._checks: Dict[str, Dict[str, Callable[[Any], Any]]] = {
+            entity_type: {
+                name: rule.compile()
+                for name, rule in self.rules.items()
+                if rule.entity_types is None or entity_type in rule.entity_types
+            }
+            for entity_type in entity_types
+        }
+        self._pairs: List[Tuple[str, str]] = [
+            (name, name[: -len(low)] + high)
+            for name in self.rules
+            for low, high in _BOUND_PAIRS
+            if name.endswith(low) and name[: -len(low)] + high in self.rules
+        ]
+
+    @classmethod
+    def from_schema(cls, input_schema: Mapping[str, Any]) -> "InsightsFilterValidator":
+        """Build from the get_insights inputSchema (``entity_type`` and ``filters`` properties)."""
+        properties = input_schema.get("properties", {})
+        filter_schemas = properties.get("filters", {}).get("properties", {})
+        rules = {name: FilterRule.from_schema(name, schema) for name, schema in filter_schemas.items()}
+        entity_types = set(_ENTITY_TYPE.findall(properties.get("entity_type", {}).get("description", "")))
+        for rule in rules.values():
+            entity_types.update(rule.entity_types or ())
+        return cls(frozenset(entity_types), rules)
+
+    def normalize(self, payload: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return the validated payload with normalized values, ``None`` values dropped.
+
+        Raises ``ValueError`` listing every problem found.
+        """
+        entity_type = payload.get("filter.type")
+        checks = self._checks.get(entity_type)
+        if checks is None:
+            raise ValueError(
+                f"filter.type must be one of: {', '.join(sorted(self.entity_types))}"
+            )
+
+        errors = []
+        normalized = {}
+        for name, value in payload.items():
+            if value is None:
+                continue
+            check = checks.get(name)
+            if check is not None:
+                try:
+                    value = check(value)
+                except ValueError as e:
+                    errors.append(str(e))
+                    continue
+            elif name in self.rules:
+                available = ", ".join(sorted(self.rules[name].entity_types or ()))
+                errors.append(f"{name} is not available for {entity_type} (available to: {available})")
+                continue
+            normalized[name] = value
+
+        for low, high in self._pairs:
+            if low in normalized and high in normalized and normalized[low] > normalized[high]:
+                errors.append(f"{low} must not be greater than {high}")
+        if errors:
+            raise ValueError("; ".join(errors))
+        return normalized
+
+
+_validator: Optional[InsightsFilterValidator] = None
+
+
+def get_filter_validator() -> InsightsFilterValidator:
+    global _validator
+    if _validator is None:
+        from src.qloo_mcp_server.catalog import ToolCatalog
+
+        _validator = InsightsFilterValidator.from_schema(ToolCatalog.load().by_name["get_insights"].inputSchema)
+    return _validator
+
+
+def configure_filter_validator(input_schema: Mapping[str, Any]) -> InsightsFilterValidator:
+    global _validator
+    _validator = InsightsFilterValidator.from_schema(input_schema)
+    return _validator
@@ -1,75 +1,224 @@
 
+import asyncio
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from urllib.parse import quote
-from src.qloo_mcp_server.constant import QLOO_API, QLOO_API_KEY
-from src.qloo_mcp_server.utils import encode_form_query
+from src.qloo_mcp_server.constant import QLOO_API
+from src.qloo_mcp_server.utils import encode_form_query, query_key
+from src.qloo_mcp_server.upstream import UpstreamUnavailable
+from src.qloo_mcp_server.cache import get_cache
+from src.qloo_mcp_server.tenants import current_tenant, get_tenants
+from src.qloo_mcp_server.prune import Projection, decode_and_prune, decode_body, prune_results
+from src.qloo_mcp_server.offload import get_offloader
+from src.qloo_mcp_server.metrics import stage
+from src.qloo_mcp_server.audience_index import get_audience_index
+from src.qloo_mcp_server.prefetch import get_prefetcher, register_refresher
 
 
 
 
-def clean_audience_response(response: httpx.Response) -> Dict[str, Any]:
-    
+AUDIENCE_PROJECTIONS = {
+    "audiences": Projection(drop=frozenset(["entity_id", "parents", "type", "id", "disambiguation", "tags"])),
+    "audience_types": Projection(drop=frozenset(["parents"])),
+}
 
+
+# The audience index pages through each type with explicit take/page on top of
+# the tool's own request, so audiences past the API's default page are found too.
+INDEX_PAGE_SIZE = 500
+MAX_INDEX_PAGES = 20
+
+
+def clean_audience_response(response: httpx.Response, tool: str = "get_audience_by_type", prune: bool = True) -> Dict[str, Any]:
     try:
-        res_data = response.json()
-        audiences = res_data.get("results", {})
-        if "audiences" in audiences:
-            audiences = audiences.get("audiences", [])
-            keys_to_remove = ["entity_id","parents","type","id","disambiguation","tags"]
-        elif "audience_types" in audiences:
-            audiences = audiences.get("audience_types", [])
-            keys_to_remove =["parents"]
-        for audience in audiences:
-
-            for key in keys_to_remove:
-                audience.pop(key, None)
-
-        return res_data
-    except (httpx.JSONDecodeError, ValueError):
+        with stage(tool, "decode"):
+            data = decode_body(response.content)
+        if not prune:
+            return data
+        with stage(tool, "prune"):
+            return prune_results(data, AUDIENCE_PROJECTIONS)
+    except ValueError:
         return {"ok": False, "error": "Invalid JSON response"}
 
-def get_audience_types() -> Dict[str, Any]:
-    if not QLOO_API_KEY:
-        return {"ok": False, "error": "QLOO_API_KEY is required for API calls"}
 
-    url = f"{QLOO_API.rstrip('/')}/v2/audiences/types"
-    headers = {
-        "Accept": "application/json",
-        "X-API-Key": QLOO_API_KEY
-    }
+async def clean_audience_response_async(
+    response: httpx.Response, tool: str = "get_audience_by_type", prune: bool = True
+) -> Dict[str, Any]:
+    """``clean_audience_response``, in the offload pool when the body is large enough to stall the event loop."""
+    offloader = get_offloader()
+    if not offloader.accepts(len(response.content)):
+        return clean_audience_response(response, tool, prune=prune)
     try:
-        with httpx.Client(timeout=30) as client:
-            response = client.get(url, headers=headers)
-        clean_data = clean_audience_response(response)
-        if response.status_code == 200:
-            return {"ok": True, "data": clean_data}
-        return {"ok": False, "status_code": response.status_code, "error": response.text}
-    except httpx.RequestError as e:
-        return {"ok": False, "error": f"Network error: {e}"}
+        return await offloader.run(tool, decode_and_prune, response.content, AUDIENCE_PROJECTIONS if prune else {})
+    except ValueError:
+        return {"ok": False, "error": "Invalid JSON response"}
+
+async def get_audience_types() -> Dict[str, Any]:
+    if not current_tenant().api_key:
+        return {"ok": False, "error": "A QLOO API key is required for API calls"}
 
+    # The taxonomy is the same for every API key, so all tenants share the index.
+    indexed = get_audience_index().types_result()
+    if indexed is not None:
+        return indexed
+    return await get_cache().get_or_fetch(
+        "get_audience_types",
+        "",
+        lambda: _fetch_audiences("get_audience_types", "/v2/audiences/types", None),
+        namespace=current_tenant().namespace,
+    )
 
-def get_audience_by_type(parent_type: str) -> Dict[str, Any]:
-    if not QLOO_API_KEY:
-        return {"ok": False, "error": "QLOO_API_KEY is required for API calls"}
+
+async def get_audience_by_type(parent_type: str) -> Dict[str, Any]:
+    if not current_tenant().api_key:
+        return {"ok": False, "error": "A QLOO API key is required for API calls"}
     if not parent_type or not str(parent_type).startswith("urn:audience:"):
         return {"ok": False, "error": "parent type must start with 'urn:audience:'"}
 
+    indexed = get_audience_index().by_type_result(parent_type)
+    if indexed is not None:
+        return indexed
+
     payload = {"filter.parents.types": parent_type}
-    
 
-    query_string = encode_form_query(payload, explode=False)
-    url = f"{QLOO_API.rstrip('/')}/v2/audiences"
-    headers = {
-        "Accept": "application/json",
-        "X-API-Key": QLOO_API_KEY
+    namespace = current_tenant().namespace
+    with stage("get_audience_by_type", "encode"):
+        query_string = encode_form_query(payload)
+        cache_key = query_key(query_string)
+    get_prefetcher().record("get_audience_by_type", cache_key, query_string, namespace)
+    return await get_cache().get_or_fetch(
+        "get_audience_by_type",
+        cache_key,
+        lambda: _fetch_audiences_by_type(query_string),
+        namespace=namespace,
+    )
+
+
+async def _fetch_audiences_by_type(query_string: str) -> Dict[str, Any]:
+    return await _fetch_audiences("get_audience_by_type", "/v2/audiences", query_string)
+
+
+async def find_audience(query: str, parent_type: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    if not current_tenant().api_key:
+        return {"ok": False, "error": "A QLOO API key is required for API calls"}
+    if not query or not str(query).strip():
+        return {"ok": False, "error": "query must not be empty"}
+
+    index = get_audience_index()
+    if not index.loaded:
+        # First use before the startup warm-up finished (or with warming disabled).
+        refreshed = await refresh_audience_index()
+        if not refreshed["ok"]:
+            return refreshed
+    elif not index.is_fresh():
+        # Stale matches beat waiting for dozens of QLOO API calls, the rebuild runs in the background.
+        _start_index_refresh()
+    with stage("find_audience", "lookup"):
+        matches = index.lookup(query, parent_type=parent_type, limit=limit)
+    return {"ok": True, "data": {"matches": matches}}
+
+
+_index_refresh: Optional[asyncio.Task] = None
+
+
+async def refresh_audience_index() -> Dict[str, Any]:
+    """Rebuild the audience index, concurrent callers share one rebuild.
+
+    On failure the previous index is kept and the error is returned.
+    """
+    return await asyncio.shield(_start_index_refresh())
+
+
+def _start_index_refresh() -> asyncio.Task:
+    global _index_refresh
+    if _index_refresh is None or _index_refresh.done():
+        tenants = get_tenants()
+        # Every tenant shares the index, so it is built with the server's own key
+        # rather than whichever tenant happened to trigger the rebuild.
+        builder = tenants.default if tenants.default.api_key else current_tenant()
+        with tenants.use(builder):
+            _index_refresh = asyncio.ensure_future(_build_audience_index())
+    return _index_refresh
+
+
+async def run_audience_index(interval: float, retry_interval: float = 60.0) -> None:
+    """Warm the audience index now and keep refreshing it, sooner after a failure."""
+    while True:
+        result = await refresh_audience_index()
+        await asyncio.sleep(interval if result["ok"] else min(interval, retry_interval))
+
+
+async def _build_audience_index() -> Dict[str, Any]:
+    types_raw = await _fetch_audiences("audience_index", "/v2/audiences/types", None, prune=False)
+    if not types_raw["ok"]:
+        return types_raw
+    audience_types = _result_list(types_raw["data"], "audience_types")
+    type_ids = [item["id"] for item in audience_types if isinstance(item.get("id"), str)]
+
+    fetched = await asyncio.gather(*(_index_audience_type(type_id) for type_id in type_ids))
+    for type_result in fetched:
+        if not type_result["ok"]:
+            return type_result
+
+    index = get_audience_index()
+    index.load(
+        types_result={"ok": True, "data": prune_results(types_raw["data"], AUDIENCE_PROJECTIONS)},
+        by_type_results={type_id: type_result["result"] for type_id, type_result in zip(type_ids, fetched)},
+        audience_types=audience_types,
+        audiences={type_id: type_result["audiences"] for type_id, type_result in zip(type_ids, fetched)},
+    )
+    return {"ok": True, "data": index.stats()}
+
+
+async def _index_audience_type(parent_type: str) -> Dict[str, Any]:
+    # The same request get_audience_by_type makes, its pruned body is served as the tool result.
+    query_string = encode_form_query({"filter.parents.types": parent_type}, explode=False)
+    raw = await _fetch_audiences("audience_index", "/v2/audiences", query_string, prune=False)
+    if not raw["ok"]:
+        return raw
+
+    audiences = {}
+    for item in _result_list(raw["data"], "audiences"):
+        audiences.setdefault(item.get("id"), item)
+    for page in range(1, MAX_INDEX_PAGES + 1):
+        page_query = encode_form_query(
+            {"filter.parents.types": parent_type, "take": INDEX_PAGE_SIZE, "page": page}, explode=False
+        )
+        paged = await _fetch_audiences("audience_index", "/v2/audiences", page_query, prune=False)
+        if not paged["ok"]:
+            return paged
+        items = _result_list(paged["data"], "audiences")
+        for item in items:
+            audiences.setdefault(item.get("id"), item)
+        if len(items) < INDEX_PAGE_SIZE:
+            break
+
+    return {
+        "ok": True,
+        "result": {"ok": True, "data": prune_results(raw["data"], AUDIENCE_PROJECTIONS)},
+        "audiences": list(audiences.values()),
     }
+
+
+def _result_list(data: Dict[str, Any], list_key: str) -> List[Dict[str, Any]]:
+    results = data.get("results")
+    items = results.get(list_key) if isinstance(results, dict) else None
+    return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+
+async def _fetch_audiences(tool: str, path: str, query_string: Optional[str], prune: bool = True) -> Dict[str, Any]:
+    url = f"{QLOO_API.rstrip('/')}{path}"
     try:
-        with httpx.Client(timeout=30) as client:
-            response = client.get(url, params=query_string, headers=headers)
-        clean_data = clean_audience_response(response)
+        with stage(tool, "upstream"):
+            response = await current_tenant().get(url, params=query_string)
+        clean_data = await clean_audience_response_async(response, tool, prune=prune)
         if response.status_code == 200:
             return {"ok": True, "data": clean_data}
         return {"ok": False, "status_code": response.status_code, "error": response.text}
+    except UpstreamUnavailable as e:
+        return {"ok": False, "error": str(e)}
     except httpx.RequestError as e:
-        return {"ok": False, "error": f"Network error: {e}"}
\ No newline at end of file
+        return {"ok": False, "error": f"Network error: {e}"}
+
+
+register_refresher("get_audience_by_type", _fetch_audiences_by_type)
@@ -1,41 +1,60 @@
+import asyncio
 import time
 import httpx
-from typing import Optional, Dict, Any
+from typing import Awaitable, Callable, Optional, Dict, Any, List
 from urllib.parse import quote
-from src.qloo_mcp_server.constant import QLOO_API, QLOO_API_KEY
+from src.qloo_mcp_server.constant import QLOO_API
 import json
-from src.qloo_mcp_server.utils import encode_form_query
+from src.qloo_mcp_server.utils import encode_form_query, query_key
+from src.qloo_mcp_server.upstream import UpstreamUnavailable
+from src.qloo_mcp_server.cache import get_cache
+from src.qloo_mcp_server.tenants import current_tenant
+from src.qloo_mcp_server.prune import Projection, decode_and_prune, decode_body, prune_results
+from src.qloo_mcp_server.offload import get_offloader
+from src.qloo_mcp_server.metrics import stage
+from src.qloo_mcp_server.filter_schema import get_filter_validator
+from src.qloo_mcp_server.prefetch import get_prefetcher, register_refresher
 
 
-def clean_response(response: httpx.Response) -> Dict[str, Any]:
-    keys_to_remove = [
-        "entity_id", "type", "subtype", "popularity", "tags", "query",
-        "disambiguation", "external"
-    ]
-    properties_keys_to_remove = [
-        "format", "isbn10", "isbn13", "publication_year", "short_description",
-        "short_descriptions", "release_year", "content_rating", "akas",
-        "keywords"
-    ]
+INSIGHTS_PROJECTIONS = {
+    "entities": Projection(
+        drop=frozenset([
+            "entity_id", "type", "subtype", "popularity", "tags", "query",
+            "disambiguation", "external"
+        ]),
+        nested={
+            "properties": Projection(drop=frozenset([
+                "format", "isbn10", "isbn13", "publication_year", "short_description",
+                "short_descriptions", "release_year", "content_rating", "akas",
+                "keywords"
+            ])),
+        },
+    ),
+}
 
+
+def clean_response(response: httpx.Response, tool: str = "get_insights") -> Dict[str, Any]:
+    try:
+        with stage(tool, "decode"):
+            data = decode_body(response.content)
+        with stage(tool, "prune"):
+            return prune_results(data, INSIGHTS_PROJECTIONS)
+    except ValueError:
+        return {"ok": False, "error": "Invalid JSON response"}
+
+
+async def clean_response_async(response: httpx.Response, tool: str = "get_insights") -> Dict[str, Any]:
+    """``clean_response``, in the offload pool when the body is large enough to stall the event loop."""
+    offloader = get_offloader()
+    if not offloader.accepts(len(response.content)):
+        return clean_response(response, tool)
     try:
-        res_data = response.json()
-        entities = res_data.get("results", {}).get("entities", [])
-        for entity in entities:
-
-            for key in keys_to_remove:
-                entity.pop(key, None)
-            
-            props = entity.get("properties", {})
-            if isinstance(props, dict):
-                for prop_key in properties_keys_to_remove:
-                    props.pop(prop_key, None)
-        return res_data
-    except (httpx.JSONDecodeError, ValueError):
+        return await offloader.run(tool, decode_and_prune, response.content, INSIGHTS_PROJECTIONS)
+    except ValueError:
         return {"ok": False, "error": "Invalid JSON response"}
 
 
-def get_insights(payload) -> Dict[str, Any]:
+async def get_insights(payload) -> Dict[str, Any]:
     if not payload:
         return {"ok": False, "error": "Payload cannot be empty"}
     if isinstance(payload, str):
@@ -45,31 +64,177 @@ def get_insights(payload) -> Dict[str, Any]:
             return {"ok": False, "error": "Invalid JSON payload"}
     elif not isinstance(payload, dict):
         return {"ok": False, "error": "Payload must be a JSON object or string"}
-    if not QLOO_API_KEY:
-        return {"ok": False, "error": "QLOO_API_KEY is required for API calls"}
+    if not current_tenant().api_key:
+        return {"ok": False, "error": "A QLOO API key is required for API calls"}
     if "filter.type" not in payload or not str(payload.get("filter.type", "")).startswith("urn:entity:"):
         return {"ok": False, "error": "Payload must contain 'filter.type' starting with 'urn:entity:'"}
 
+    # Bad filters are rejected here instead of by the API, and equivalent
+    # values (1990, 1990.0) normalize to the same cache key.
+    with stage("get_insights", "validate"):
+        try:
+            payload = get_filter_validator().normalize(payload)
+        except ValueError as e:
+            return {"ok": False, "error": f"Invalid filters: {e}"}
+
     payload.setdefault("take", 10)
-    query_string = encode_form_query(payload, explode=False)
+    # Canonical so that the same filters in a different order share a cache entry.
+    namespace = current_tenant().namespace
+    with stage("get_insights", "encode"):
+        query_string = encode_form_query(payload, canonical=True)
+        cache_key = query_key(query_string)
+    get_prefetcher().record("get_insights", cache_key, query_string, namespace)
+    return await get_cache().get_or_fetch(
+        "get_insights", cache_key, lambda: _fetch_insights(query_string), namespace=namespace
+    )
+
+
+async def _fetch_insights(query_string: str) -> Dict[str, Any]:
     url = f"{QLOO_API.rstrip('/')}/v2/insights"
-    headers = {
-        "Accept": "application/json",
-        "X-API-Key": QLOO_API_KEY
-    }
     try:
-        with httpx.Client(timeout=30) as client:
-            response = client.get(url, params=query_string, headers=headers)
-        clean_data = clean_response(response)
+        with stage("get_insights", "upstream"):
+            response = await current_tenant().get(url, params=query_string)
+        clean_data = await clean_response_async(response)
         if response.status_code == 200:
             return {"ok": True, "data": clean_data}
         return {"ok": False, "status_code": response.status_code, "error": response.text}
+    except UpstreamUnavailable as e:
+        return {"ok": False, "error": str(e)}
     except httpx.RequestError as e:
         return {"ok": False, "error": f"Network error: {e}"}
-    
 
-def get_insights_by_entity_type(entity_type: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+
+register_refresher("get_insights", _fetch_insights)
+
+
+async def get_insights_by_entity_type(entity_type: str, filters: Dict[str, Any]) -> Dict[str, Any]:
     payload = {"filter.type": entity_type}
     if filters:
         payload.update(filters)
-    return get_insights(payload)
+    return await get_insights(payload)
+
+
+MAX_PAGINATED_RESULTS = 1000
+
+
+async def get_insights_paginated(
+    entity_type: str,
+    filters: Dict[str, Any],
+    max_results: int,
+    page_size: int = 50,
+    on_page: Optional[Callable[[int, List[Dict[str, Any]], int], Awaitable[None]]] = None,
+    limit: Optional[asyncio.Semaphore] = None,
+) -> Dict[str, Any]:
+    """Page through /v2/insights until ``max_results`` entities or the last page.
+
+    The next page is requested before the current one is awaited, so its
+    upstream round trip overlaps decoding and pruning of the current page.
+    ``on_page(page, entities, received)`` is awaited for each page as it
+    arrives, for streaming it to the client. The entities are then not kept,
+    the result only reports ``pages`` and ``count``. Each page request holds
+    a slot of ``limit``, if given, while it runs.
+    """
+    if not isinstance(max_results, int) or not 1 <= max_results <= MAX_PAGINATED_RESULTS:
+        return {"ok": False, "error": f"max_results must be between 1 and {MAX_PAGINATED_RESULTS}"}
+    if not isinstance(page_size, int) or page_size < 1:
+        return {"ok": False, "error": "page_size must be a positive integer"}
+    page_size = min(page_size, max_results)
+
+    base = {"filter.type": entity_type}
+    if filters:
+        base.update(filters)
+
+    async def get_page(page: int) -> Dict[str, Any]:
+        if limit is None:
+            return await get_insights({**base, "take": page_size, "page": page})
+        async with limit:
+            return await get_insights({**base, "take": page_size, "page": page})
+
+    def fetch(page: int) -> "asyncio.Future[Dict[str, Any]]":
+        return asyncio.ensure_future(get_page(page))
+
+    entities: List[Dict[str, Any]] = []
+    received = 0
+    # Pages fetched and kept, ``page`` is already one ahead when the loop ends at ``max_results``.
+    pages = 0
+    page = 1
+    next_task: Optional["asyncio.Future[Dict[str, Any]]"] = fetch(page)
+    try:
+        while next_task is not None:
+            current = next_task
+            next_task = fetch(page + 1) if received + page_size < max_results else None
+            result = await current
+            if not result.get("ok"):
+                if not received:
+                    return result
+                # Report where it stopped, with what was received unless it was already streamed.
+                if on_page is not None:
+                    return {**result, "pages": pages, "count": received}
+                return {**result, "pages": pages, "data": {"results": {"entities": entities}}}
+
+            page_entities = result["data"].get("results", {}).get("entities", [])[: max_results - received]
+            received += len(page_entities)
+            pages += 1
+            if on_page is None:
+                entities.extend(page_entities)
+            elif page_entities:
+                await on_page(page, page_entities, received)
+            if len(page_entities) < page_size:
+                break
+            page += 1
+    finally:
+        if next_task is not None:
+            next_task.cancel()
+
+    if on_page is not None:
+        return {"ok": True, "pages": pages, "count": received}
+    return {"ok": True, "pages": pages, "data": {"results": {"entities": entities}}}
+
+
+MAX_BATCH_ITEMS = 25
+
+
+async def get_insights_batch(items: List[Dict[str, Any]], max_concurrency: int = 8) -> Dict[str, Any]:
+    if not isinstance(items, list) or not items:
+        return {"ok": False, "error": "items must be a non-empty list"}
+    if len(items) > MAX_BATCH_ITEMS:
+        return {"ok": False, "error": f"items cannot contain more than {MAX_BATCH_ITEMS} queries"}
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(
+        entity_type: str, filters: Dict[str, Any], max_results: Optional[int], page_size: int
+    ) -> Dict[str, Any]:
+        try:
+            if max_results:
+                # Slots are taken per page, a paginated item's prefetched next page counts against the cap too.
+                return await get_insights_paginated(entity_type, filters, max_results, page_size, limit=semaphore)
+            async with semaphore:
+                return await get_insights_by_entity_type(entity_type, filters)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    # Identical sub-queries share one task, results are returned in item order.
+    tasks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+    slots: List[Any] = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("filters", {}), dict):
+            slots.append({"ok": False, "error": "Each item must be an object with 'entity_type' and 'filters'"})
+            continue
+        entity_type = item.get("entity_type")
+        filters = dict(item.get("filters") or {})
+        max_results = item.get("max_results")
+        page_size = item.get("page_size", 50)
+        key = json.dumps([entity_type, filters, max_results, page_size], sort_keys=True, default=str)
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(run(entity_type, filters, max_results, page_size))
+        slots.append(tasks[key])
+
+    if tasks:
+        await asyncio.gather(*tasks.values())
+    results = [slot.result() if isinstance(slot, asyncio.Future) else slot for slot in slots]
+    return {
+        "ok": True,
+        "errors": sum(1 for result in results if not result.get("ok")),
+        "results": results,
+    }
@@ -0,0 +1,282 @@
+import bisect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.qloo_mcp_server.cache import get_cache
+from src.qloo_mcp_server.client import pool_stats
+from src.qloo_mcp_server.upstream import get_upstream
+
+# Upper bounds in seconds, from sub-millisecond local work to slow upstream calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    # Label values from configuration (tenant names) may contain anything.
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.values[labelvalues] = self.values.get(labelvalues, 0.0) + amount
+
+    def render(self, kind: str = "counter") -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {kind}"
+        for labelvalues, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value:g}"
+
+
+class Gauge(Counter):
+    def set(self, *labelvalues: str, value: float) -> None:
+        self.values[labelvalues] = value
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def render(self, kind: str = "gauge") -> Iterable[str]:
+        return super().render(kind)
+
+
+class Histogram:
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (+Inf last), sum]
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self.values.get(labelvalues)
+        if series is None:
+            series = self.values[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labelvalues, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {total[0]:g}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Any] = []
+        self.collectors: List[Callable[[], Iterable[Any]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Any]]) -> None:
+        """Collectors build metrics from live state (pool, cache) at scrape time."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_REQUESTS = REGISTRY.register(Counter("qloo_mcp_tool_requests_total", "Tool calls received.", ["tool"]))
+TOOL_ERRORS = REGISTRY.register(
+    Counter("qloo_mcp_tool_errors_total", "Tool calls that returned ok=false or raised.", ["tool", "status_code"])
+)
+TOOL_INFLIGHT = REGISTRY.register(Gauge("qloo_mcp_tool_inflight", "Tool calls currently being served.", ["tool"]))
+TOOL_DURATION = REGISTRY.register(
+    Histogram("qloo_mcp_tool_duration_seconds", "End-to-end tool call latency.", ["tool"])
+)
+STAGE_DURATION = REGISTRY.register(
+    Histogram(
+        "qloo_mcp_stage_duration_seconds",
+        "Time spent per stage of a QLOO API call: encode, upstream, decode and prune, or queue and offload when decoding runs in the offload pool.",
+        ["tool", "stage"],
+    )
+)
+
+
+class stage:
+    """Times a block into STAGE_DURATION: ``with stage("get_insights", "upstream"): ...``"""
+
+    __slots__ = ("labels", "start")
+
+    def __init__(self, tool: str, name: str):
+        self.labels = (tool, name)
+
+    def __enter__(self) -> "stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        STAGE_DURATION.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class track_tool:
+    """Counts a tool call, its in-flight time and, via ``record``, its outcome."""
+
+    __slots__ = ("tool", "start", "recorded")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.recorded = False
+
+    def __enter__(self) -> "track_tool":
+        TOOL_REQUESTS.inc(self.tool)
+        TOOL_INFLIGHT.inc(self.tool)
+        self.start = time.perf_counter()
+        return self
+
+    def record(self, result: Any) -> None:
+        if isinstance(result, dict) and result.get("ok") is False:
+            TOOL_ERRORS.inc(self.tool, str(result.get("status_code", "none")))
+        self.recorded = True
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        TOOL_INFLIGHT.dec(self.tool)
+        TOOL_DURATION.observe(time.perf_counter() - self.start, self.tool)
+        if exc_type is not None and not self.recorded:
+            TOOL_ERRORS.inc(self.tool, "exception")
+
+
+def collect_cache(stats: Callable[[], Dict[str, Any]], prefix: str = "qloo_mcp_cache") -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = stats()
+        for key in ("hits", "shared_hits", "misses", "coalesced", "evictions", "quota_evictions"):
+            counter = Counter(f"{prefix}_{key}_total", f"Response cache {key.replace('_', ' ')}.")
+            counter.inc(amount=current[key])
+            yield counter
+        for key in ("size", "maxsize", "inflight"):
+            gauge = Gauge(f"{prefix}_{key}", f"Response cache {key}.")
+            gauge.set(value=current[key])
+            yield gauge
+
+    return collector
+
+
+def collect_pool(pool_stats: Callable[[], Optional[Dict[str, int]]]) -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = pool_stats()
+        if current is None:
+            return
+        gauge = Gauge("qloo_mcp_upstream_connections", "Connections in the QLOO API pool.", ["state"])
+        for state, value in current.items():
+            gauge.set(state, value=value)
+        yield gauge
+
+    return collector
+
+
+def collect_upstream(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = stats()
+        for key in ("attempts", "retried", "hedged", "hedge_wins", "rejected", "rate_limited", "breaker_opens"):
+            counter = Counter(f"qloo_mcp_upstream_{key}_total", f"QLOO API calls {key.replace('_', ' ')}.")
+            counter.inc(amount=current[key])
+            yield counter
+        gauge = Gauge("qloo_mcp_upstream_breaker_open", "1 while the circuit breaker rejects calls.", ["state"])
+        gauge.set(current["breaker_state"], value=0 if current["breaker_state"] == "closed" else 1)
+        yield gauge
+
+    return collector
+
+
+def collect_offload(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = stats()
+        if current["mode"] == "off":
+            return
+        for key, documentation in (
+            ("offloaded", "Responses decoded in the offload pool."),
+            ("inline", "Responses small enough to be decoded on the event loop."),
+            ("blocked", "Responses that waited for a free slot in the offload queue."),
+        ):
+            counter = Counter(f"qloo_mcp_offload_{key}_total", documentation)
+            counter.inc(amount=current[key])
+            yield counter
+        gauge = Gauge("qloo_mcp_offload_pending", "Decode/prune jobs queued or running in the offload pool.")
+        gauge.set(value=current["pending"])
+        yield gauge
+
+    return collector
+
+
+def collect_tenants(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = stats()
+        for key in ("attempts", "rejected", "rate_limited"):
+            counter = Counter(
+                f"qloo_mcp_tenant_upstream_{key}_total", f"QLOO API calls {key.replace('_', ' ')}, by tenant.", ["tenant"]
+            )
+            for tenant in current["tenants"]:
+                counter.inc(tenant["name"], amount=tenant["upstream"][key])
+            yield counter
+        inflight = Gauge("qloo_mcp_tenant_inflight", "Tool calls and QLOO API calls in progress, by tenant.", ["tenant"])
+        for tenant in current["tenants"]:
+            inflight.set(tenant["name"], value=tenant["inflight"])
+        yield inflight
+        pools = Gauge("qloo_mcp_tenant_pools", "Per-tenant QLOO API connection pools currently open.")
+        pools.set(value=current["pools"])
+        yield pools
+
+    return collector
+
+
+def collect_prefetch(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterable[Any]]:
+    def collector() -> Iterable[Any]:
+        current = stats()
+        if not current["enabled"]:
+            return
+        for key, documentation in (
+            ("refreshed", "Cached results refreshed in the background before they expired."),
+            ("failed", "Background refreshes that did not return a result."),
+            ("over_budget", "Refresh passes cut short by the prefetch budget."),
+        ):
+            counter = Counter(f"qloo_mcp_prefetch_{key}_total", documentation)
+            counter.inc(amount=current[key])
+            yield counter
+        for key, documentation in (
+            ("tracked", "Distinct recent queries tracked for prefetching."),
+            ("due", "Hot queries whose cached result is missing or about to expire."),
+        ):
+            gauge = Gauge(f"qloo_mcp_prefetch_{key}", documentation)
+            gauge.set(value=current[key])
+            yield gauge
+
+    return collector
+
+
+REGISTRY.add_collector(collect_cache(lambda: get_cache().stats()))
+REGISTRY.add_collector(collect_pool(pool_stats))
+REGISTRY.add_collector(collect_upstream(lambda: get_upstream().stats()))
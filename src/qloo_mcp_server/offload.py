@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.qloo_mcp_server.metrics import REGISTRY, STAGE_DURATION, collect_offload
+from src.qloo_mcp_server.settings import OFFLOAD_MODES as MODES
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[float, float, Any]:
+    # Runs in the worker. time.monotonic is system-wide on Linux, so the start
+    # time is comparable with the submit time taken in the server process.
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic() - started, result
+
+
+class Offloader:
+    """Runs CPU-heavy work (decoding and pruning large QLOO API bodies) off the event loop.
+
+    Bodies smaller than ``threshold`` bytes are handled inline, where a pool
+    round trip would cost more than it saves. At most ``workers + max_queue``
+    jobs are submitted at once, further callers wait for a slot, so a burst of
+    large responses queues up here instead of growing the pool's queue without
+    bound. Time from ``run`` to the job starting in a worker is recorded as
+    the ``queue`` stage, time spent in the worker as ``offload``.
+    """
+
+    def __init__(self, mode: str = "off", workers: int = 2, threshold: int = 256 * 1024, max_queue: int = 64):
+        if mode not in MODES:
+            raise ValueError(f"offload mode must be one of: {', '.join(MODES)}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.threshold = threshold
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        self.pending = 0
+        self.blocked = 0
+        self.offloaded = 0
+        self.inline = 0
+
+    def accepts(self, size: int) -> bool:
+        """Whether a body of ``size`` bytes is worth sending to the pool, counts it if not."""
+        if self.mode == "off" or size < self.threshold:
+            self.inline += 1
+            return False
+        return True
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="qloo-offload")
+        return self._executor
+
+    async def run(self, tool: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool, ``fn`` and its arguments must be picklable in process mode."""
+        loop = asyncio.get_running_loop()
+        submitted = time.monotonic()
+        self.pending += 1
+        try:
+            if self._slots.locked():
+                self.blocked += 1
+            await self._slots.acquire()
+            try:
+                future = self._get_executor().submit(_timed, fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            # Released when the job really finishes, not when the caller stops waiting for it.
+            future.add_done_callback(lambda _: self._release(loop))
+            self.offloaded += 1
+            started, duration, result = await asyncio.wrap_future(future)
+        finally:
+            self.pending -= 1
+        STAGE_DURATION.observe(max(0.0, started - submitted), tool, "queue")
+        STAGE_DURATION.observe(duration, tool, "offload")
+        return result
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:  # the loop already closed at shutdown
+            pass
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "threshold": self.threshold,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "blocked": self.blocked,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+        }
+
+
+_offloader = Offloader()
+
+
+def get_offloader() -> Offloader:
+    return _offloader
+
+
+def configure_offloader(**options: Any) -> Offloader:
+    global _offloader
+    _offloader.close()
+    _offloader = Offloader(**options)
+    return _offloader
+
+
+REGISTRY.add_collector(collect_offload(lambda: get_offloader().stats()))
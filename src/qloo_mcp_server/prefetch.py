@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.qloo_mcp_server.cache import get_cache
+from src.qloo_mcp_server.metrics import REGISTRY, collect_prefetch
+from src.qloo_mcp_server.tenants import get_tenants
+from src.qloo_mcp_server.upstream import TokenBucket
+
+# (tool, cache namespace, cache key)
+Entry = Tuple[str, str, str]
+
+# Tool -> coroutine function fetching its result from a query string, registered by the tool modules.
+REFRESHERS: Dict[str, Callable[[str], Awaitable[Dict[str, Any]]]] = {}
+
+WARM_SET_VERSION = 1
+# Counts reloaded from a warm set are capped, old traffic should not outweigh new traffic for long.
+MAX_LOADED_HITS = 64
+
+
+def register_refresher(tool: str, fetch: Callable[[str], Awaitable[Dict[str, Any]]]) -> None:
+    REFRESHERS[tool] = fetch
+
+
+class FrequencySketch:
+    """Count-min sketch of how often keys were seen, ``depth`` rows of ``width`` counters.
+
+    Every counter is halved after ``sample_size`` additions, so the counts
+    follow recent traffic. Estimates never undercount, they may overcount.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: Optional[int] = None):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self.rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self.additions = 0
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # Double hashing, one hash() per key gives all ``depth`` indexes.
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+        self.additions += count
+        if self.additions >= self.sample_size:
+            self.rows = [array("I", (value >> 1 for value in row)) for row in self.rows]
+            self.additions //= 2
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+
+class Prefetcher:
+    """Refreshes hot cached results before they expire, and keeps them warm across restarts.
+
+    Every ``record``ed query is counted in a FrequencySketch and the last
+    ``max_tracked`` distinct ones are kept with their query strings. Every
+    ``interval`` seconds those seen at least ``min_hits`` times whose cached
+    result expires within ``ahead`` of its TTL are fetched again, hottest
+    first, spending at most ``budget`` QLOO API calls per minute. Queries not
+    seen for two TTLs are left to expire, and results no longer cached
+    (expired or evicted) are left to the next request for them.
+    """
+
+    def __init__(
+        self,
+        budget: float = 30.0,
+        min_hits: int = 3,
+        max_tracked: int = 1024,
+        interval: float = 5.0,
+        ahead: float = 0.2,
+    ):
+        self.budget = budget
+        self.min_hits = min_hits
+        self.max_tracked = max_tracked
+        self.interval = interval
+        self.ahead = ahead
+        self.sketch = FrequencySketch()
+        # Entry -> (query string, last seen)
+        self.tracked: "OrderedDict[Entry, Tuple[str, float]]" = OrderedDict()
+        rate = budget / 60.0
+        self.limiter = TokenBucket(rate, max(1.0, rate * interval)) if budget > 0 else None
+        self._save_failed = False
+        self.recorded = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.over_budget = 0
+        self.loaded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limiter is not None
+
+    def record(self, tool: str, key: str, query_string: str, namespace: str = "") -> None:
+        if self.limiter is None:
+            return
+        entry = (tool, namespace, key)
+        self.sketch.add(entry)
+        self.tracked[entry] = (query_string, time.monotonic())
+        self.tracked.move_to_end(entry)
+        if len(self.tracked) > self.max_tracked:
+            self.tracked.popitem(last=False)
+        self.recorded += 1
+
+    def due(self) -> List[Tuple[int, Entry, str]]:
+        """``(hits, entry, query string)`` of the entries to refresh now, hottest first."""
+        cache = get_cache()
+        now = time.monotonic()
+        due = []
+        for entry, (query_string, last_seen) in self.tracked.items():
+            tool, namespace, key = entry
+            ttl = cache.ttls.get(tool, 0)
+            if ttl <= 0 or tool not in REFRESHERS or now - last_seen > 2 * ttl:
+                continue
+            hits = self.sketch.estimate(entry)
+            if hits < self.min_hits:
+                continue
+            # A missing result may not fit in the cache at all, fetching it again every pass would only spend budget.
+            cached = cache.peek(tool, key, namespace)
+            if cached is not None and cached[1] <= max(2 * self.interval, self.ahead * ttl):
+                due.append((hits, entry, query_string))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return due
+
+    async def refresh_due(self) -> int:
+        if self.limiter is None:
+            return 0
+        tenants = get_tenants()
+        refreshed = 0
+        for _, entry, query_string in self.due():
+            tool, namespace, key = entry
+            tenant = tenants.for_namespace(namespace)
+            if tenant is None or not tenant.api_key:
+                continue
+            if not self.limiter.try_acquire():
+                self.over_budget += 1
+                break
+            with tenants.use(tenant):
+                result = await get_cache().refresh(
+                    tool, key, lambda: REFRESHERS[tool](query_string), namespace=namespace
+                )
+            if result.get("ok"):
+                refreshed += 1
+            else:
+                # Not retried every pass, it is tracked again when it is next requested.
+                self.failed += 1
+                self.tracked.pop(entry, None)
+        self.refreshed += refreshed
+        return refreshed
+
+    async def run(self, path: Optional[str] = None, save_interval: float = 60.0) -> None:
+        """Refresh due entries every ``interval`` seconds and save the warm set to ``path`` now and then."""
+        saved_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh_due()
+            if path and time.monotonic() - saved_at >= save_interval:
+                await self.save(path)
+                saved_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The hot entries with their cached results, expiry as wall clock time so it survives a restart."""
+        cache = get_cache()
+        now = time.time()
+        entries = []
+        for entry, (query_string, _) in self.tracked.items():
+            hits = self.sketch.estimate(entry)
+            if hits < self.min_hits:
+                continue
+            tool, namespace, key = entry
+            item: Dict[str, Any] = {"tool": tool, "namespace": namespace, "key": key, "query": query_string, "hits": hits}
+            cached = cache.peek(tool, key, namespace)
+            if cached is not None:
+                item["value"], item["expires_at"] = cached[0], now + cached[1]
+            entries.append(item)
+        return {"version": WARM_SET_VERSION, "entries": entries}
+
+    async def save(self, path: str) -> bool:
+        if self.limiter is None:
+            return False
+        # Cached values are never mutated, so they can be serialized off the event loop.
+        snapshot = self.snapshot()
+        try:
+            await asyncio.to_thread(_write_warm_set, path, snapshot)
+        except OSError as e:
+            if not self._save_failed:
+                print(f"Could not save the warm set to {path}: {e}", file=sys.stderr)
+            self._save_failed = True
+            return False
+        return True
+
+    def load(self, path: str) -> int:
+        """Track the entries of a saved warm set and cache their results that have not expired yet."""
+        if self.limiter is None:
+            return 0
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"Ignoring the warm set in {path}: {e}", file=sys.stderr)
+            return 0
+        if not isinstance(data, dict) or data.get("version") != WARM_SET_VERSION:
+            return 0
+
+        cache = get_cache()
+        now, seen = time.time(), time.monotonic()
+        loaded = 0
+        for item in data.get("entries", []):
+            try:
+                tool, namespace, key, query_string = item["tool"], item["namespace"], item["key"], item["query"]
+                hits = min(int(item.get("hits", 0)), MAX_LOADED_HITS)
+            except (KeyError, TypeError, ValueError):
+                continue
+            entry = (tool, namespace, key)
+            self.sketch.add(entry, hits)
+            self.tracked[entry] = (query_string, seen)
+            remaining = item.get("expires_at", 0) - now
+            if isinstance(item.get("value"), dict) and remaining > 0:
+                cache.set(tool, key, item["value"], min(remaining, cache.ttls.get(tool, 0)), namespace)
+            loaded += 1
+        while len(self.tracked) > self.max_tracked:
+            self.tracked.popitem(last=False)
+        self.loaded += loaded
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "budget": self.budget,
+            "tracked": len(self.tracked),
+            "due": len(self.due()) if self.enabled else 0,
+            "recorded": self.recorded,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "loaded": self.loaded,
+        }
+
+
+def _write_warm_set(path: str, snapshot: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Written next to the file and renamed over it, so a reader never sees half a warm set.
+    temporary = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+_prefetcher = Prefetcher(budget=0)
+
+
+def get_prefetcher() -> Prefetcher:
+    return _prefetcher
+
+
+def configure_prefetcher(**options: Any) -> Prefetcher:
+    global _prefetcher
+    _prefetcher = Prefetcher(**options)
+    return _prefetcher
+
+
+REGISTRY.add_collector(collect_prefetch(lambda: get_prefetcher().stats()))
@@ -0,0 +1,73 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # orjson is optional, see the "fast-json" extra
+    loads = json.loads
+    JSON_BACKEND = "json"
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which keys of a JSON object survive pruning.
+
+    ``keep`` is an allow-list (``None`` keeps every key), ``drop`` is removed on
+    top of that, and ``nested`` projects the value of a kept key further.
+    """
+
+    keep: Optional[FrozenSet[str]] = None
+    drop: FrozenSet[str] = frozenset()
+    nested: Mapping[str, "Projection"] = field(default_factory=dict)
+
+
+def project(obj: Any, projection: Projection) -> Any:
+    if not isinstance(obj, dict):
+        return obj
+    keep, drop, nested = projection.keep, projection.drop, projection.nested
+    # Builds a new dict in one pass instead of popping keys one at a time, the
+    # pruned subtrees are released together with the decoded source object.
+    out = {}
+    for key, value in obj.items():
+        if key in drop or (keep is not None and key not in keep):
+            continue
+        sub = nested.get(key)
+        out[key] = value if sub is None else project(value, sub)
+    return out
+
+
+def decode_body(body: bytes) -> Dict[str, Any]:
+    """Decode a QLOO API body, raises ``ValueError`` unless it is a JSON object."""
+    data = loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    return data
+
+
+def prune_results(data: Dict[str, Any], projections: Mapping[str, Projection]) -> Dict[str, Any]:
+    """Project every item of the ``results`` lists of a decoded QLOO API body.
+
+    ``projections`` maps a list key under ``results`` (e.g. ``entities``) to
+    the projection applied to each of its items.
+    """
+    results = data.get("results")
+    if isinstance(results, dict):
+        for list_key, projection in projections.items():
+            items = results.get(list_key)
+            if isinstance(items, list):
+                results[list_key] = [project(item, projection) for item in items]
+    return data
+
+
+def decode_and_prune(body: bytes, projections: Mapping[str, Projection]) -> Dict[str, Any]:
+    """``decode_body`` then ``prune_results``, as one picklable call for the offload pool."""
+    try:
+        data = decode_body(body)
+    except ValueError as e:
+        # Decoder errors (e.g. orjson.JSONDecodeError) do not all survive pickling.
+        raise ValueError(str(e)) from None
+    return prune_results(data, projections)
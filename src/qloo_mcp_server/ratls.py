@@ -0,0 +1,54 @@
+import concurrent.futures
+import os
+import ssl
+import sys
+import time
+
+from src.qloo_mcp_server.startup import get_startup_profile
+
+
+def cert_is_reusable(key_file_path: str, crt_file_path: str, max_age: float) -> bool:
+    """Whether a key and cert left on the tmpfs by an earlier start can be served again.
+
+    They must match each other, the cert must be at most ``max_age`` seconds
+    old (its attestation quote was taken when it was written) and not expire
+    within the next ``max_age`` seconds either.
+    """
+    # Imported here, in the cert thread, to keep it off the startup path.
+    from cryptography import x509
+
+    try:
+        age = time.time() - os.path.getmtime(crt_file_path)
+        if max_age <= 0 or age > max_age:
+            return False
+        ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER).load_cert_chain(crt_file_path, key_file_path)
+        with open(crt_file_path, "rb") as f:
+            not_after = x509.load_pem_x509_certificate(f.read()).not_valid_after_utc.timestamp()
+    except (OSError, ssl.SSLError, ValueError):
+        return False
+    return not_after - time.time() > max_age
+
+
+def ensure_ra_tls_key_and_crt(key_file_path: str, crt_file_path: str, max_age: float = 0.0) -> bool:
+    """Generate the RA-TLS key and cert unless reusable ones exist, returns whether they were reused."""
+    with get_startup_profile().phase("ra_tls_cert"):
+        if cert_is_reusable(key_file_path, crt_file_path, max_age):
+            print(f"Reusing RA-TLS certificate {crt_file_path}", file=sys.stderr)
+            return True
+        # Imported here, it is not needed (and may not load) in dev mode.
+        from gramine_ratls.attest import write_ra_tls_key_and_crt
+
+        write_ra_tls_key_and_crt(key_file_path, crt_file_path, format="pem")
+        return False
+
+
+def start_ra_tls_key_and_crt(key_file_path: str, crt_file_path: str, max_age: float = 0.0) -> "concurrent.futures.Future[bool]":
+    """Start ``ensure_ra_tls_key_and_crt`` in a thread so it overlaps imports and app construction.
+
+    Quote generation mostly waits on the platform outside Python, so the
+    thread does not compete for the GIL. ``.result()`` re-raises its errors.
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="ra-tls")
+    future = executor.submit(ensure_ra_tls_key_and_crt, key_file_path, crt_file_path, max_age)
+    executor.shutdown(wait=False)
+    return future
@@ -1,20 +1,11 @@
-import contextlib
-from collections.abc import AsyncIterator
-import os, io
+from typing import Optional
 import click
-import httpx
-import uvicorn
-import mcp.types as types
-from mcp.server.lowlevel import Server
-from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
-from starlette.applications import Starlette
-from starlette.routing import Mount, Route
-from starlette.responses import PlainTextResponse
-from starlette.types import Receive, Scope, Send
 
-from src.qloo_mcp_server.get_insights import get_insights_by_entity_type
-from gramine_ratls.attest import write_ra_tls_key_and_crt
-import sys
+# Only what parsing the command line needs is imported up front. uvicorn, mcp,
+# starlette and the tool modules are imported in main(), after RA-TLS cert
+# generation has been started, so the two overlap.
+from src.qloo_mcp_server.settings import OFFLOAD_MODES, ServerSettings
+from src.qloo_mcp_server.startup import configure_startup_profile
 
 
 
@@ -26,249 +17,155 @@ import sys
     is_flag=True,
     help="Is development mode on",
 )
+@click.option("--sse", is_flag=True, help="Stream responses as server-sent events, paginated get_insights results are sent page by page")
+@click.option("--workers", default=1, help="Number of worker processes serving requests")
+@click.option("--compression/--no-compression", default=True, help="Compress HTTP responses with br or gzip when the client accepts it")
+@click.option("--compression-min-size", default=1024, help="Responses smaller than this many bytes are sent uncompressed")
+@click.option("--max-connections", default=100, help="Maximum open connections to the QLOO API")
+@click.option("--max-keepalive", default=20, help="Maximum idle keep-alive connections kept in the pool")
+@click.option("--http2", is_flag=True, help="Use HTTP/2 for QLOO API calls (requires the 'h2' package)")
+@click.option("--batch-concurrency", default=8, help="Maximum concurrent QLOO API calls per get_insights_batch call")
+@click.option("--offload", type=click.Choice(OFFLOAD_MODES), default="thread", help="Where large QLOO API responses are decoded and pruned: inline on the event loop ('off'), a thread pool or a process pool")
+@click.option("--offload-workers", default=2, help="Threads or processes in the offload pool")
+@click.option("--offload-threshold", default=256 * 1024, help="Responses of at least this many bytes are decoded in the offload pool")
+@click.option("--offload-queue", default=64, help="Jobs that may wait for an offload worker before further responses wait their turn")
+@click.option("--retries", default=2, help="Retries for QLOO API calls that fail with 429/5xx or a network error")
+@click.option("--hedge-after", type=float, default=None, help="Send a second identical QLOO API request if the first takes longer than this many seconds")
+@click.option("--rate-limit", type=float, default=None, help="Maximum QLOO API requests per second from this process")
+@click.option("--breaker-threshold", default=5, help="Consecutive QLOO API failures that open the circuit breaker (0 disables it)")
+@click.option("--breaker-reset", default=30.0, help="Seconds the circuit breaker stays open before letting a probe through")
+@click.option("--tenants-file", type=click.Path(exists=True, dir_okay=False), default=None, help="JSON file mapping client bearer tokens to tenants: {\"<token>\": {\"api_key\": ..., \"name\": ..., \"rate_limit\": ...}}")
+@click.option("--allow-client-keys", is_flag=True, help="Let clients send their own QLOO API key in the X-Qloo-Api-Key header")
+@click.option("--tenant-pools", default=32, help="Tenant API keys that keep an open connection pool, the least recently used idle one is closed beyond that")
+@click.option("--tenant-max-connections", default=20, help="Maximum open connections to the QLOO API per tenant API key")
+@click.option("--tenant-rate-limit", type=float, default=None, help="Maximum QLOO API requests per second per tenant API key, unless its tenants file entry sets rate_limit")
+@click.option("--cache-size", default=1024, help="Maximum number of cached tool results (0 disables the cache)")
+@click.option("--tenant-cache-size", default=256, help="Maximum number of cached tool results per tenant API key (0 for no per-tenant limit)")
+@click.option("--insights-ttl", default=300.0, help="Seconds to cache get_insights results")
+@click.option("--audience-types-ttl", default=3600.0, help="Seconds to cache get_audience_types results")
+@click.option("--audience-ttl", default=3600.0, help="Seconds to cache get_audience_by_type results")
+@click.option("--audience-index-refresh", default=3600.0, help="Seconds between background refreshes of the local audience index (0 disables warming it at startup)")
+@click.option("--prefetch-budget", default=30.0, help="QLOO API calls per minute spent refreshing frequently requested results before they expire (0 disables prefetching)")
+@click.option("--prefetch-min-hits", default=3, help="Recent requests a query needs before its result is refreshed in the background")
+@click.option("--warm-set-path", default="/app/tmp/warm_set.json", help="File the frequently requested results are saved to and reloaded from at startup (empty to not persist them)")
+@click.option("--shared-cache", is_flag=True, help="Share cached results between worker processes (with --workers > 1)")
+@click.option("--shared-cache-size", default=8192, help="Maximum number of results in the shared cache")
+@click.option("--cert-max-age", default=86400.0, help="Reuse an RA-TLS key and cert found on the tmpfs if they are at most this many seconds old (0 always generates new ones)")
+@click.option("--profile-startup", is_flag=True, help="Print time to ready, startup phases and import time per module")
+@click.option("--startup-budget", type=float, default=None, help="Warn when the server takes longer than this many seconds to become ready")
 
 # Add an option for API key
 
-def main(port: int, isDev: bool) -> int:
-    
-    if not isDev:
-        key_file_path = "/app/tmp/key.pem"
-        crt_file_path = "/app/tmp/crt.pem"
-        write_ra_tls_key_and_crt(key_file_path, crt_file_path, format="pem")
-    # Store API key for use in API calls
-
-
-    app = Server("qloo-mcp-server")
-
-    @app.call_tool()
-    async def qloo_tool(name: str, arguments: dict):
-        
-        if name == "get_insights":
-            return get_insights_by_entity_type(entity_type = arguments["entity_type"], filters=arguments["filters"])
-            # return get_insights(arguments["payload"])
-        elif name == "get_audience_types":
-            from src.qloo_mcp_server.get_audience import get_audience_types
-            return get_audience_types()
-        elif name == "get_audience_by_type":
-            from src.qloo_mcp_server.get_audience import get_audience_by_type
-            return get_audience_by_type(parent_type=arguments["parent_type"])
-        else:
-            raise ValueError(f"Unknown tool: {name}")
-
-    @app.list_tools()
-    async def list_tools() -> list[types.Tool]:
-        try:
-            tools_to_send = [
-                types.Tool(
-                    name= "get_insights",
-                    description=  "Fetch insights for a specific entity type by applying relevant filters. Must include 'filter.type' (e.g., 'urn:entity:movie') and at least one other valid filter. Entity can be only one from the list ['artist','brand','movie', 'tv_show', 'book', 'place', 'podcast','video_game', 'music','destination','person'] and there is different filters for each entity type. Configure the filters in the payload.",
-                    inputSchema= {
-                        "type": "object",
-                        "properties": {
-                          "entity_type": {
-                              "type": "string",
-                              "description": "URN identifier for the entity type. Must be one of: 'urn:entity:artist', 'urn:entity:brand', 'urn:entity:movie', 'urn:entity:tv_show', 'urn:entity:book', 'urn:entity:place', 'urn:entity:podcast', 'urn:entity:video_game', 'urn:entity:music', 'urn:entity:destination', 'urn:entity:person'."
-                          },
-                          "filters": {
-                            "type": "object",
-                            "description": "A JSON object containing the applicable filters based on the entity. At least one filter must be present.",
-                            "properties" : {
-                              "filter.address": {
-                                  "type": "string",
-                                  "description": "Find places by matching part of their address, like a city or street name. Available to: Place"
-                              },
-                              "filter.content_rating": {
-                                  "type": "string",
-                                  "description": "Filter movies or TV shows by MPAA ratings, like 'PG' or 'PG-13'. Available to: Movie, TV Show"
-                              },
-                              "filter.release_year.min": {
-                                  "type": "integer",
-                                  "description": "Only include movies or TV shows released after this year. Available to: Movie, TV Show"
-                              },
-                              "filter.release_year.max": {
-                                  "type": "integer",
-                                  "description": "Only include movies or TV shows released before this year. Available to: Movie, TV Show"
-                              },
-                              "filter.date_of_birth.min": {
-                                  "type": "string",
-                                  "description": "Only include people born after this date (YYYY-MM-DD). Available to: Person"
-                              },
-                              "filter.date_of_birth.max": {
-                                  "type": "string",
-                                  "description": "Only include people born before this date (YYYY-MM-DD). Available to: Person"
-                              },
-                              "filter.gender": {
-                                  "type": "string",
-                                  "description": "Filter people by gender, like 'male' or 'female'. Available to: Person"
-                              },
-                              "filter.price_level.min": {
-                                  "type": "integer",
-                                  "description": "Only include places with a price level at least this value (1-4). Available to: Place"
-                              },
-                              "filter.price_level.max": {
-                                  "type": "integer",
-                                  "description": "Only include places with a price level at most this value (1-4). Available to: Place"
-                              },
-                              "filter.publication_year.min": {
-                                  "type": "number",
-                                  "description": "Only include books published after this year. Available to: Book"
-                              },
-                              "filter.publication_year.max": {
-                                  "type": "number",
-                                  "description": "Only include books published before this year. Available to: Book"
-                              },
-                              "filter.location": {
-                                  "type": "string",
-                                  "description": "Find places or destinations by location, using a WKT POINT or locality ID. Available to: Place, Destination"
-                              },
-                              "filter.location.radius": {
-                                  "type": "integer",
-                                  "description": "Set the search radius in meters around the location. Available to: Place, Destination"
-                              },
-                              "filter.audience.types": {
-                                  "type": "string",
-                                  "description": "Filter by a list of audience types."
-                              },
-                              "filter.external.resy.count.max": {
-                                  "type": "integer",
-                                  "description": "Only include places with a Resy rating count at most this value. Available to: Place"
-                              },
-                              "filter.external.resy.count.min": {
-                                  "type": "integer",
-                                  "description": "Only include places with a Resy rating count at least this value. Available to: Place"
-                              },
-                              "filter.external.resy.party_size.max": {
-                                  "type": "integer",
-                                  "description": "Only include places with a Resy party size at most this value. Available to: Place"
-                              },
-                              "filter.external.resy.party_size.min": {
-                                  "type": "integer",
-                                  "description": "Only include places with a Resy party size at least this value. Available to: Place"
-                              },
-                              "filter.external.resy.rating.max": {
-                                  "type": "number",
-                                  "description": "Only include places with a Resy rating at most this value. Available to: Place"
-                              },
-                              "filter.external.resy.rating.min": {
-                                  "type": "number",
-                                  "description": "Only include places with a Resy rating at least this value. Available to: Place"
-                              },
-                              "filter.finale_year.max": {
-                                  "type": "integer",
-                                  "description": "Only include TV shows with a final season before this year. Available to: TV Show"
-                              },
-                              "filter.finale_year.min": {
-                                  "type": "integer",
-                                  "description": "Only include TV shows with a final season after this year. Available to: TV Show"
-                              },
-                              "filter.exclude.location": {
-                                  "type": "string",
-                                  "description": "Exclude results inside a specific location, using WKT or locality ID. Available to: Destination, Place"
-                              },
-                              "filter.location.query": {
-                                  "type": "string",
-                                  "description": "Search for localities by name or ID. Available to: Destination, Place"
-                              },
-                              "filter.exclude.location.query": {
-                                  "type": "string",
-                                  "description": "Exclude results inside a specific locality, using name or ID. Available to: Destination, Place"
-                              },
-                              "filter.location.geohash": {
-                                  "type": "string",
-                                  "description": "Filter by geohash prefix to find places in a region. Available to: Destination, Place"
-                              },
-                              "filter.exclude.location.geohash": {
-                                  "type": "string",
-                                  "description": "Exclude places whose geohash starts with this prefix. Available to: Destination, Place"
-                              },
-                              "filter.price_range.from": {
-                                  "type": "integer",
-                                  "description": "Only include places with a minimum price at least this value. Available to: Place"
-                              },
-                              "filter.price_range.to": {
-                                  "type": "integer",
-                                  "description": "Only include places with a maximum price at most this value. Available to: Place"
-                              },
-                              "filter.release_country": {
-                                  "type": "string",
-                                  "description": "Filter by countries where a movie or TV show was released. Available to: Movie, TV Show"
-                              },
-                              "filter.release_date.max": {
-                                  "type": "string",
-                                  "description": "Only include items released before this date (YYYY-MM-DD)."
-                              },
-                              "filter.release_date.min": {
-                                  "type": "string",
-                                  "description": "Only include items released after this date (YYYY-MM-DD)."
-                              }
-                            }
-                          }
-                        }
-                    }
-                  ),
-                  types.Tool(
-                    name="get_audience_types",
-                    description="Fetch all audience types available in the QLOO API. when you call this tool, it will return a list of all audience types. remove the urn:audience: prefix from the audience type.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {None: {"type": "null"}},
-                    }
-                  ),
-                  types.Tool(
-                    name="get_audience_by_type",
-                    description="Fetch audiences by a specific parent type. The parent type must start with 'urn:audience:'.",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "parent_type": {
-                                "type": "string",
-                                "description": "Parent type to filter audiences by, must start with 'urn:audience:'. Audiences must be one of the following: 'urn:audience:artist', 'urn:audience:brand', 'urn:audience:movie', 'urn:audience:tv_show', 'urn:audience:book', 'urn:audience:place', 'urn:audience:podcast', 'urn:audience:video_game', 'urn:audience:music', 'urn:audience:destination', 'urn:audience:person'.'urn:audience:communities','urn:audience:global_issues','urn:audience:hobbies_and_interests','urn:audience:investing_interests','urn:audience:leisure','urn:audience:life_stage','urn:audience:lifestyle_preferences_beliefs','urn:audience:political_preferences','urn:audience:professional_area','urn:audience:spending_habits'"
-                            }
-                        }
-                    }
-                  )]
-        except Exception as e:
-            print(f"Error creating tools: {e}", file=sys.stderr)
-            tools_to_send = []
-        return tools_to_send
-
-    # Create the session manager with true stateless mode
-    session_manager = StreamableHTTPSessionManager(
-        app=app,
-        event_store=None,
-        json_response=True,
-        stateless=True,
+def main(
+    port: int,
+    isDev: bool,
+    sse: bool,
+    workers: int,
+    compression: bool,
+    compression_min_size: int,
+    max_connections: int,
+    max_keepalive: int,
+    http2: bool,
+    batch_concurrency: int,
+    offload: str,
+    offload_workers: int,
+    offload_threshold: int,
+    offload_queue: int,
+    retries: int,
+    hedge_after: Optional[float],
+    rate_limit: Optional[float],
+    breaker_threshold: int,
+    breaker_reset: float,
+    tenants_file: Optional[str],
+    allow_client_keys: bool,
+    tenant_pools: int,
+    tenant_max_connections: int,
+    tenant_rate_limit: Optional[float],
+    cache_size: int,
+    tenant_cache_size: int,
+    insights_ttl: float,
+    audience_types_ttl: float,
+    audience_ttl: float,
+    audience_index_refresh: float,
+    prefetch_budget: float,
+    prefetch_min_hits: int,
+    warm_set_path: str,
+    shared_cache: bool,
+    shared_cache_size: int,
+    cert_max_age: float,
+    profile_startup: bool,
+    startup_budget: Optional[float],
+) -> int:
+    profile = configure_startup_profile(profile_imports=profile_startup, budget=startup_budget)
+    settings = ServerSettings(
+        port=port,
+        is_dev=isDev,
+        sse=sse,
+        workers=workers,
+        compression=compression,
+        compression_min_size=compression_min_size,
+        max_connections=max_connections,
+        max_keepalive=max_keepalive,
+        http2=http2,
+        batch_concurrency=batch_concurrency,
+        offload=offload,
+        offload_workers=offload_workers,
+        offload_threshold=offload_threshold,
+        offload_queue=offload_queue,
+        retries=retries,
+        hedge_after=hedge_after,
+        rate_limit=rate_limit,
+        breaker_threshold=breaker_threshold,
+        breaker_reset=breaker_reset,
+        tenants_file=tenants_file,
+        allow_client_keys=allow_client_keys,
+        tenant_pools=tenant_pools,
+        tenant_max_connections=tenant_max_connections,
+        tenant_rate_limit=tenant_rate_limit,
+        cache_size=cache_size,
+        tenant_cache_size=tenant_cache_size,
+        insights_ttl=insights_ttl,
+        audience_types_ttl=audience_types_ttl,
+        audience_ttl=audience_ttl,
+        audience_index_refresh=audience_index_refresh,
+        prefetch_budget=prefetch_budget,
+        prefetch_min_hits=prefetch_min_hits,
+        warm_set_path=warm_set_path or None,
+        shared_cache=shared_cache,
+        shared_cache_size=shared_cache_size,
+        cert_max_age=cert_max_age,
+        profile_startup=profile_startup,
+        startup_budget=startup_budget,
     )
 
-    async def handle_streamable_http(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await session_manager.handle_request(scope, receive, send)
+    # Generated once here, worker processes are handed the same key and cert.
+    cert = None
+    if not isDev:
+        from src.qloo_mcp_server.ratls import start_ra_tls_key_and_crt
 
-    @contextlib.asynccontextmanager
-    async def lifespan(app: Starlette) -> AsyncIterator[None]:
-        """Context manager for session manager."""
-        async with session_manager.run():
-            print("Application started with StreamableHTTP session manager!")
-            try:
-                yield
-            finally:
-                print("Application shutting down...")
+        cert = start_ra_tls_key_and_crt(settings.key_file_path, settings.crt_file_path, max_age=cert_max_age)
+    # Store API key for use in API calls
 
-    # Create an ASGI application using the transport
-    starlette_app = Starlette(
-        debug=True,
-        routes=[
-            Mount("/mcp", app=handle_streamable_http),
-        ],
-        lifespan=lifespan,
-    )
+    if workers > 1:
+        from src.qloo_mcp_server.workers import run_workers
 
+        if cert is not None:
+            cert.result()
+        run_workers(settings)
+        return
 
+    with profile.phase("imports"):
+        import uvicorn
+        from src.qloo_mcp_server.app import create_app
+    with profile.phase("create_app"):
+        app = create_app(settings)
     if isDev:
-        uvicorn.run(starlette_app, host="0.0.0.0", port=port, workers=1, reload=False)
+        uvicorn.run(app, host="0.0.0.0", port=port, workers=1, reload=False)
     else:
-        uvicorn.run(starlette_app, host="0.0.0.0", port=port, workers=1, reload=False, ssl_keyfile=key_file_path, ssl_certfile=crt_file_path)
+        with profile.phase("ra_tls_cert_wait"):
+            cert.result()
+        uvicorn.run(app, host="0.0.0.0", port=port, workers=1, reload=False, ssl_keyfile=settings.key_file_path, ssl_certfile=settings.crt_file_path)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import Optional
+
+OFFLOAD_MODES = ("off", "thread", "process")
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """Everything create_app needs, picklable so it can be handed to worker processes."""
+
+    port: int = 8000
+    is_dev: bool = False
+    sse: bool = False
+    workers: int = 1
+    compression: bool = True
+    compression_min_size: int = 1024
+    max_connections: int = 100
+    max_keepalive: int = 20
+    http2: bool = False
+    batch_concurrency: int = 8
+    offload: str = "thread"
+    offload_workers: int = 2
+    offload_threshold: int = 256 * 1024
+    offload_queue: int = 64
+    retries: int = 2
+    hedge_after: Optional[float] = None
+    rate_limit: Optional[float] = None
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    tenants_file: Optional[str] = None
+    allow_client_keys: bool = False
+    tenant_pools: int = 32
+    tenant_max_connections: int = 20
+    tenant_rate_limit: Optional[float] = None
+    cache_size: int = 1024
+    tenant_cache_size: int = 256
+    insights_ttl: float = 300.0
+    audience_types_ttl: float = 3600.0
+    audience_ttl: float = 3600.0
+    audience_index_refresh: float = 3600.0
+    prefetch_budget: float = 30.0
+    prefetch_min_hits: int = 3
+    warm_set_path: Optional[str] = "/app/tmp/warm_set.json"
+    shared_cache: bool = False
+    shared_cache_size: int = 8192
+    shared_cache_path: Optional[str] = None
+    key_file_path: str = "/app/tmp/key.pem"
+    crt_file_path: str = "/app/tmp/crt.pem"
+    cert_max_age: float = 86400.0
+    profile_startup: bool = False
+    startup_budget: Optional[float] = None
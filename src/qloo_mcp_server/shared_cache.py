@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import json
+import struct
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+from src.qloo_mcp_server.cache import ResponseCache
+from src.qloo_mcp_server.prune import loads
+
+# Every message is a 4-byte big-endian length followed by a JSON object.
+_HEADER = struct.Struct(">I")
+
+
+async def _read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return loads(await reader.readexactly(size))
+
+
+def _write_message(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    writer.write(_HEADER.pack(len(body)) + body)
+
+
+class SharedCacheServer:
+    """Cross-worker cache served over a unix socket by the supervising process.
+
+    A unix socket rather than a file on /app/tmp, because Gramine's tmpfs is
+    private to each process while unix sockets work between the processes of
+    one Gramine instance. Entries are stored under the tenant namespace the
+    worker sends, so ``namespace_maxsize`` holds tenants to the same quota as
+    in the workers' own caches.
+    """
+
+    def __init__(self, path: str, maxsize: int, namespace_maxsize: int = 0):
+        self.path = path
+        self.store = ResponseCache(maxsize=maxsize, ttls={}, namespace_maxsize=namespace_maxsize)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Closing the connections lets every handler finish its read loop.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request = await _read_message(reader)
+                if request["op"] == "get":
+                    entry = self.store.get_entry(request["tool"], request["key"], request.get("namespace", ""))
+                    reply = {"value": None} if entry is None else {"value": entry[0], "ttl": entry[1]}
+                elif request["op"] == "set":
+                    self.store.set(
+                        request["tool"], request["key"], request["value"], request["ttl"], request.get("namespace", "")
+                    )
+                    reply = {"ok": True}
+                else:
+                    reply = {"error": f"Unknown op: {request['op']}"}
+                reply["id"] = request.get("id")
+                _write_message(writer, reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+
+class SharedCacheClient:
+    """Worker side of the shared cache.
+
+    Connects lazily on first use. Requests are pipelined over the one
+    connection and matched to their replies by id, so concurrent misses do
+    not queue behind each other's round trips, and ``timeout`` bounds each
+    whole exchange. Any failure is counted and treated as a miss so a worker
+    keeps serving from its local cache and the QLOO API.
+    """
+
+    def __init__(self, path: str, timeout: float = 1.0):
+        self.path = path
+        self.timeout = timeout
+        self.errors = 0
+        self._connect_lock = asyncio.Lock()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._replies: Optional[asyncio.Task] = None
+        self._pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._ids = itertools.count()
+
+    async def _request(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        request_id = next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = reply
+        try:
+            return await asyncio.wait_for(self._exchange(request_id, message, reply), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            if self.errors == 0:
+                print(f"Shared cache unavailable at {self.path}: {e!r}", file=sys.stderr)
+            self.errors += 1
+            # A late reply to a timed out request is dropped by id, the connection stays usable.
+            if not isinstance(e, asyncio.TimeoutError):
+                await self._disconnect()
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _exchange(
+        self, request_id: int, message: Dict[str, Any], reply: "asyncio.Future[Dict[str, Any]]"
+    ) -> Dict[str, Any]:
+        writer = await self._connect()
+        _write_message(writer, {**message, "id": request_id})
+        await writer.drain()
+        return await reply
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._replies = asyncio.ensure_future(self._read_replies(reader, self._writer))
+            return self._writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                reply = await _read_message(reader)
+                future = self._pending.get(reply.pop("id", None))
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            if self._writer is writer:
+                self._writer = self._replies = None
+                writer.close()
+                self._fail_pending(e)
+
+    async def _disconnect(self) -> None:
+        writer, replies = self._writer, self._replies
+        self._writer = self._replies = None
+        if writer is not None:
+            writer.close()
+            self._fail_pending(ConnectionError("disconnected"))
+        if replies is not None:
+            replies.cancel()
+
+    def _fail_pending(self, error: BaseException) -> None:
+        # Everything still waiting was sent on the lost connection, none of it will be answered.
+        for future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(ConnectionError(f"Shared cache connection lost: {error!r}"))
+
+    async def get(self, tool: str, key: str, namespace: str = "") -> Optional[Tuple[Dict[str, Any], float]]:
+        reply = await self._request({"op": "get", "tool": tool, "key": key, "namespace": namespace})
+        if not reply or reply.get("value") is None:
+            return None
+        return reply["value"], reply["ttl"]
+
+    async def set(self, tool: str, key: str, value: Dict[str, Any], ttl: float, namespace: str = "") -> None:
+        await self._request(
+            {"op": "set", "tool": tool, "key": key, "value": value, "ttl": ttl, "namespace": namespace}
+        )
+
+    async def close(self) -> None:
+        await self._disconnect()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "connected": self._writer is not None, "errors": self.errors}
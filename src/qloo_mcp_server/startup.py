@@ -0,0 +1,151 @@
+import contextlib
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _process_age() -> float:
+    """Seconds since this process started, 0 where /proc is not available."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+LAUNCHED = time.monotonic() - _process_age()
+
+
+class _TimedLoader:
+    """Wraps a module loader to time ``exec_module``, everything else is delegated."""
+
+    def __init__(self, loader: Any, timer: "ImportTimer"):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        stack = self._timer.stack()
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            self._timer.modules.append((module.__name__, cumulative - children, cumulative))
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Records self and cumulative time per imported module, like ``python -X importtime``."""
+
+    def __init__(self) -> None:
+        self.modules: List[Tuple[str, float, float]] = []
+        # Per thread, the RA-TLS cert is generated (and gramine_ratls imported) concurrently.
+        self._local = threading.local()
+
+    def stack(self) -> List[float]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def by_package(self) -> List[Tuple[str, float]]:
+        totals: Dict[str, float] = defaultdict(float)
+        for name, own, _ in self.modules:
+            totals[name.split(".", 1)[0]] += own
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class StartupProfile:
+    """Time to ready and its phases, checked against an optional budget in seconds.
+
+    With ``profile_imports`` an ImportTimer is installed and the report printed
+    at ready lists import time per top-level package and per module.
+    """
+
+    def __init__(self, profile_imports: bool = False, budget: Optional[float] = None):
+        self.budget = budget
+        self.phases: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+        self.imports: Optional[ImportTimer] = None
+        if profile_imports:
+            self.imports = ImportTimer()
+            self.imports.install()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def ready(self) -> float:
+        self.ready_after = time.monotonic() - LAUNCHED
+        if self.imports is not None:
+            self.imports.uninstall()
+            print(self.report(), file=sys.stderr)
+        if self.budget is not None and self.ready_after > self.budget:
+            hint = "" if self.imports is not None else " (run with --profile-startup for a breakdown)"
+            print(f"Startup took {self.ready_after:.2f}s, over the {self.budget:.2f}s budget{hint}", file=sys.stderr)
+        return self.ready_after
+
+    def report(self, top: int = 15) -> str:
+        lines = [f"Ready {self.ready_after:.3f}s after launch"]
+        lines += [f"  {name:<24} {seconds:8.3f}s" for name, seconds in self.phases.items()]
+        if self.imports is not None:
+            modules = self.imports.modules
+            lines.append(f"Imported {len(modules)} modules in {sum(own for _, own, _ in modules):.3f}s, by package:")
+            lines += [f"  {name:<40} {own:8.3f}s" for name, own in self.imports.by_package()[:top]]
+            lines.append("Slowest modules (self / cumulative):")
+            for name, own, cumulative in sorted(modules, key=lambda item: item[1], reverse=True)[:top]:
+                lines.append(f"  {name:<40} {own:8.3f}s {cumulative:8.3f}s")
+        return "\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ready_after": self.ready_after, "budget": self.budget, "phases": dict(self.phases)}
+
+
+_profile = StartupProfile()
+
+
+def get_startup_profile() -> StartupProfile:
+    return _profile
+
+
+def configure_startup_profile(profile_imports: bool = False, budget: Optional[float] = None) -> StartupProfile:
+    global _profile
+    _profile = StartupProfile(profile_imports=profile_imports, budget=budget)
+    return _profile
@@ -0,0 +1,233 @@
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set
+
+import httpx
+
+from src.qloo_mcp_server.client import make_client, pool_stats
+from src.qloo_mcp_server.constant import QLOO_API_KEY
+from src.qloo_mcp_server.metrics import REGISTRY, collect_tenants
+from src.qloo_mcp_server.upstream import Upstream, get_upstream
+
+# Request header a client can send its own QLOO API key in.
+API_KEY_HEADER = "x-qloo-api-key"
+
+
+class UnknownTenant(Exception):
+    """The request names a tenant (token or API key) this server does not accept."""
+
+
+class Tenant:
+    """One QLOO API key: its request headers, upstream (pool, rate limiter, breaker) and cache namespace.
+
+    The server's own key uses the shared pool and upstream and the default
+    cache namespace ``""``, other keys get a pool and upstream of their own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        api_key: str,
+        namespace: str = "",
+        upstream: Optional[Upstream] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.name = name
+        self.api_key = api_key
+        self.namespace = namespace
+        self._upstream = upstream
+        self.client = client
+        # Built once, every QLOO API call of this tenant sends the same headers.
+        self.headers = {"Accept": "application/json", "X-API-Key": api_key}
+        self.inflight = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def upstream(self) -> Upstream:
+        return self._upstream or get_upstream()
+
+    @contextlib.contextmanager
+    def busy(self) -> Iterator["Tenant"]:
+        """Marks the tenant's pool as in use, busy pools are never evicted."""
+        self.inflight += 1
+        self.last_used = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.inflight -= 1
+
+    async def get(self, url: str, params: Any = None) -> httpx.Response:
+        with self.busy():
+            return await self.upstream.get(url, params=params, headers=self.headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "namespace": self.namespace,
+            "inflight": self.inflight,
+            "idle_for": round(time.monotonic() - self.last_used, 3),
+            "connections": pool_stats(self.client),
+            "upstream": self.upstream.stats(),
+        }
+
+
+def key_namespace(api_key: str) -> str:
+    """Cache namespace of an API key, the key itself never appears in cache keys or stats."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def load_tenants_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """Read ``{"<bearer token>": {"api_key": "...", "name": "...", "rate_limit": 10}, ...}``."""
+    with open(path) as f:
+        tokens = json.load(f)
+    if not isinstance(tokens, dict):
+        raise ValueError(f"{path}: expected an object mapping bearer tokens to tenants")
+    for position, tenant in enumerate(tokens.values()):
+        if not isinstance(tenant, dict) or not isinstance(tenant.get("api_key"), str) or not tenant["api_key"]:
+            raise ValueError(f"{path}: tenant #{position + 1} needs an 'api_key'")
+    return tokens
+
+
+_current: "contextvars.ContextVar[Optional[Tenant]]" = contextvars.ContextVar("qloo_tenant", default=None)
+
+
+class TenantRegistry:
+    """Maps requests to tenants, so that tenants do not share a quota, a failure domain or cache space.
+
+    A request is served with the API key in its ``X-Qloo-Api-Key`` header when
+    ``allow_client_keys`` is set, else with the key its ``Authorization:
+    Bearer`` token maps to in ``tokens``, else with the server's own key.
+    Pools are kept for at most ``max_pools`` keys besides the server's, the
+    least recently used idle one is closed to make room for a new key.
+    """
+
+    def __init__(
+        self,
+        default: Optional[Tenant] = None,
+        tokens: Optional[Mapping[str, Dict[str, Any]]] = None,
+        allow_client_keys: bool = False,
+        max_pools: int = 32,
+        client_options: Optional[Dict[str, Any]] = None,
+        upstream_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.default = default or Tenant("default", QLOO_API_KEY)
+        self.tokens = dict(tokens or {})
+        self.allow_client_keys = allow_client_keys
+        self.max_pools = max(1, max_pools)
+        self.client_options = dict(client_options or {})
+        self.upstream_options = dict(upstream_options or {})
+        self._pools: "OrderedDict[str, Tenant]" = OrderedDict()
+        self._closing: Set[asyncio.Future] = set()
+        self.created = 0
+        self.evicted = 0
+
+    def resolve(self, headers: Mapping[str, str]) -> Tenant:
+        api_key = headers.get(API_KEY_HEADER)
+        if api_key:
+            if not self.allow_client_keys:
+                raise UnknownTenant("This server does not accept API keys from clients")
+            return self.tenant(api_key.strip())
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if self.tokens and scheme.lower() == "bearer" and token:
+            config = self.tokens.get(token.strip())
+            if config is None:
+                raise UnknownTenant("Unknown tenant token")
+            return self.tenant(config["api_key"], name=config.get("name"), rate_limit=config.get("rate_limit"))
+        return self.default
+
+    def tenant(self, api_key: str, name: Optional[str] = None, rate_limit: Optional[float] = None) -> Tenant:
+        if api_key == self.default.api_key:
+            return self.default
+        namespace = key_namespace(api_key)
+        tenant = self._pools.get(namespace)
+        if tenant is None:
+            client = make_client(**self.client_options)
+            options = dict(self.upstream_options)
+            if rate_limit is not None:
+                options["rate"] = rate_limit
+            tenant = Tenant(name or f"key-{namespace[:8]}", api_key, namespace, Upstream(client=client, **options), client)
+            self._pools[namespace] = tenant
+            self.created += 1
+            self._evict()
+        self._pools.move_to_end(namespace)
+        return tenant
+
+    def for_namespace(self, namespace: str) -> Optional[Tenant]:
+        """The tenant a cache namespace belongs to, None when its key is not known here.
+
+        Keys sent by clients are only known while their pool is open.
+        """
+        if not namespace:
+            return self.default
+        tenant = self._pools.get(namespace)
+        if tenant is not None:
+            return tenant
+        for config in self.tokens.values():
+            if key_namespace(config["api_key"]) == namespace:
+                return self.tenant(config["api_key"], name=config.get("name"), rate_limit=config.get("rate_limit"))
+        return None
+
+    def _evict(self) -> None:
+        # The newest pool is never a candidate, it was created for the current request.
+        for namespace, tenant in list(self._pools.items())[:-1]:
+            if len(self._pools) <= self.max_pools:
+                return
+            if tenant.inflight == 0:
+                del self._pools[namespace]
+                self.evicted += 1
+                closing = asyncio.ensure_future(tenant.client.aclose())
+                self._closing.add(closing)
+                closing.add_done_callback(self._closing.discard)
+
+    @contextlib.contextmanager
+    def use(self, tenant: Tenant) -> Iterator[Tenant]:
+        """Serve the tool calls in this block, and tasks they start, as ``tenant``."""
+        token = _current.set(tenant)
+        try:
+            with tenant.busy():
+                yield tenant
+        finally:
+            _current.reset(token)
+
+    def tenants(self) -> List[Tenant]:
+        return [self.default, *self._pools.values()]
+
+    async def close(self) -> None:
+        pools, self._pools = list(self._pools.values()), OrderedDict()
+        await asyncio.gather(*(tenant.client.aclose() for tenant in pools), *self._closing, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pools": len(self._pools),
+            "max_pools": self.max_pools,
+            "created": self.created,
+            "evicted": self.evicted,
+            "tenants": [tenant.stats() for tenant in self.tenants()],
+        }
+
+
+_tenants = TenantRegistry()
+
+
+def get_tenants() -> TenantRegistry:
+    return _tenants
+
+
+def configure_tenants(**options: Any) -> TenantRegistry:
+    global _tenants
+    _tenants = TenantRegistry(**options)
+    return _tenants
+
+
+def current_tenant() -> Tenant:
+    """The tenant the running tool call is served as, the server's own key outside of one."""
+    tenant = _current.get()
+    return tenant if tenant is not None else _tenants.default
+
+
+REGISTRY.add_collector(collect_tenants(lambda: get_tenants().stats()))
@@ -0,0 +1,256 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from src.qloo_mcp_server.client import get_client
+
+# 429 is retried but does not count against the breaker: it means quota, not an unhealthy API.
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+BREAKER_STATUSES = frozenset([500, 502, 503, 504])
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling the QLOO API while the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Client-side rate limiter: ``rate`` requests per second with bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep) -> None:
+        while not self.try_acquire():
+            self.waits += 1
+            await sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and lets one probe through after ``reset_timeout``."""
+
+    def __init__(self, threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.opens = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self.threshold <= 0 or self.opened_at is None:
+            return True
+        if self.probing or self.clock() - self.opened_at < self.reset_timeout:
+            return False
+        self.probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """Give up a probe that ended without a result, the next call may probe instead."""
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.threshold > 0 and (self.probing or self.failures >= self.threshold):
+            if self.opened_at is None or self.probing:
+                self.opens += 1
+            self.opened_at = self.clock()
+            self.probing = False
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+
+def parse_retry_after(value: Optional[str], now: Callable[[], float] = time.time) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class Upstream:
+    """The one path from the tool functions to the QLOO API.
+
+    Adds, around the shared pooled client: bounded retries with full-jitter
+    exponential backoff that honors ``Retry-After``, an optional hedged second
+    request when the first is slower than ``hedge_after`` seconds, a token
+    bucket rate limiter and a circuit breaker. ``client`` defaults to the
+    shared one, tenants with their own pool pass theirs. ``sleep`` and ``rng``
+    are injectable so the behavior can be replayed deterministically.
+    """
+
+    def __init__(
+        self,
+        retries: int = 2,
+        backoff_base: float = 0.25,
+        backoff_max: float = 5.0,
+        max_retry_after: float = 10.0,
+        hedge_after: Optional[float] = None,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.hedge_after = hedge_after
+        self.limiter = TokenBucket(rate, burst or max(1.0, rate)) if rate else None
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.client = client
+        self.sleep = sleep
+        self.rng = rng
+        self.attempts = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return self.rng() * min(self.backoff_max, self.backoff_base * 2 ** attempt)
+
+    def _check_breaker(self) -> bool:
+        """Raises while the breaker is open, returns whether this call is its half-open probe."""
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailable(
+                f"QLOO API is failing, not calling it for another {self.breaker.retry_in():.0f}s"
+            )
+        return self.breaker.probing
+
+    async def get(self, url: str, params: Any = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        probe = self._check_breaker()
+        try:
+            attempt = 0
+            while True:
+                if self.limiter is not None:
+                    await self.limiter.acquire(self.sleep)
+                self.attempts += 1
+                try:
+                    response = await self._send(url, params, headers)
+                except httpx.RequestError:
+                    probe = False
+                    self.breaker.record_failure()
+                    if attempt >= self.retries:
+                        raise
+                    delay = self._backoff(attempt)
+                else:
+                    probe = False
+                    if response.status_code in BREAKER_STATUSES:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                        return response
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None and retry_after > self.max_retry_after:
+                        return response
+                    delay = self._backoff(attempt) if retry_after is None else retry_after
+
+                attempt += 1
+                self.retried += 1
+                await self.sleep(delay)
+                probe = self._check_breaker()
+        except BaseException:
+            # A probe that was cancelled or failed with anything but a response or
+            # network error recorded nothing, without this the breaker would stay half open.
+            if probe:
+                self.breaker.release_probe()
+            raise
+
+    async def _send(self, url: str, params: Any, headers: Optional[Dict[str, str]]) -> httpx.Response:
+        client = self.client or get_client()
+        if self.hedge_after is None:
+            return await client.get(url, params=params, headers=headers)
+
+        first = asyncio.ensure_future(client.get(url, params=params, headers=headers))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_after)
+            if not done and (self.limiter is None or self.limiter.try_acquire()):
+                self.hedged += 1
+                pending.add(asyncio.ensure_future(client.get(url, params=params, headers=headers)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "rejected": self.rejected,
+            "rate_limited": 0 if self.limiter is None else self.limiter.waits,
+            "breaker_state": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+        }
+
+
+_upstream = Upstream()
+
+
+def get_upstream() -> Upstream:
+    return _upstream
+
+
+def configure_upstream(**options: Any) -> Upstream:
+    global _upstream
+    _upstream = Upstream(**options)
+    return _upstream
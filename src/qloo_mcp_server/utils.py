@@ -1,31 +1,48 @@
-from typing import Dict, Any
+import functools
+import hashlib
+from operator import itemgetter
+from typing import Any, Mapping
 from urllib.parse import quote
 
-def encode_form_query(data: Dict[str, Any], explode: bool = False) -> str:
-    def encode_value(value):
-        if isinstance(value, list):
-            return ",".join(quote(str(v), safe="")) if not explode else [
-                (key, quote(str(v), safe="")) for v in value
-            ]
-        elif value is None:
-            return None
-        return quote(str(value), safe="")
+# Filter names, entity/tag/audience URNs and small numbers repeat across calls,
+# their encodings are memoized. Longer values (free-text queries) are not.
+MEMO_MAX_LENGTH = 128
+
+
+@functools.lru_cache(maxsize=4096)
+def _quote_memo(text: str) -> str:
+    return quote(text, safe="")
+
+
+def _quote(text: str) -> str:
+    # Always called with str: 1, 1.0 and True must not share a memo entry.
+    return _quote_memo(text) if len(text) <= MEMO_MAX_LENGTH else quote(text, safe="")
 
+
+def encode_form_query(data: Mapping[str, Any], explode: bool = False, canonical: bool = False) -> str:
+    """Form-encode ``data`` for the QLOO API.
+
+    Keys and values are percent-encoded with no safe characters and ``None``
+    values are skipped. Lists are comma-joined, or repeated as
+    ``key=a&key=b`` with ``explode``. With ``canonical`` keys are sorted,
+    so payloads that differ only in key order encode identically.
+    """
+    items = sorted(data.items(), key=itemgetter(0)) if canonical else data.items()
     query_params = []
-    for key, value in data.items():
+    for key, value in items:
         if value is None:
             continue
-        encoded_key = quote(key, safe="")
-
+        encoded_key = _quote(key)
         if isinstance(value, list):
             if explode:
-                for v in value:
-                    query_params.append(f"{encoded_key}={quote(str(v), safe='')}")
+                query_params.extend(f"{encoded_key}={_quote(str(v))}" for v in value)
             else:
-                joined = ",".join(quote(str(v), safe="") for v in value)
-                query_params.append(f"{encoded_key}={joined}")
+                query_params.append(f"{encoded_key}={','.join(_quote(str(v)) for v in value)}")
         else:
-            encoded_value = quote(str(value), safe="")
-            query_params.append(f"{encoded_key}={encoded_value}")
+            query_params.append(f"{encoded_key}={_quote(str(value))}")
+    return "&".join(query_params)
+
 
-    return "&".join(query_params)
\ No newline at end of file
+def query_key(query_string: str) -> str:
+    """Stable 128-bit digest of a (canonical) query string, used as its cache key."""
+    return hashlib.blake2b(query_string.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,118 @@
+import asyncio
+import dataclasses
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+import uvicorn
+
+from src.qloo_mcp_server.settings import ServerSettings
+from src.qloo_mcp_server.shared_cache import SharedCacheServer
+from src.qloo_mcp_server.startup import configure_startup_profile
+
+
+def _bind_socket(port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("0.0.0.0", port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _write_pem(path: str, data: bytes) -> None:
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+
+def _run_worker(settings: ServerSettings, sock: socket.socket, tls: Optional[Tuple[bytes, bytes]]) -> None:
+    configure_startup_profile(profile_imports=settings.profile_startup, budget=settings.startup_budget)
+    from src.qloo_mcp_server.app import create_app
+
+    ssl_options = {}
+    if tls is not None:
+        # Under Gramine each process has its own /app/tmp tmpfs, so the
+        # supervisor's key and cert are written again here rather than regenerated.
+        _write_pem(settings.key_file_path, tls[0])
+        _write_pem(settings.crt_file_path, tls[1])
+        ssl_options = {"ssl_keyfile": settings.key_file_path, "ssl_certfile": settings.crt_file_path}
+
+    config = uvicorn.Config(create_app(settings), **ssl_options)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run_workers(settings: ServerSettings) -> None:
+    """Serve with ``settings.workers`` processes sharing one listening socket.
+
+    This process only supervises: it binds the port, hosts the shared cache
+    when enabled, restarts workers that die and stops them on SIGINT/SIGTERM.
+    """
+    if settings.shared_cache and not settings.shared_cache_path:
+        path = os.path.join(tempfile.mkdtemp(prefix="qloo-mcp-"), "cache.sock")
+        settings = dataclasses.replace(settings, shared_cache_path=path)
+
+    tls = None
+    if not settings.is_dev:
+        with open(settings.key_file_path, "rb") as key_file, open(settings.crt_file_path, "rb") as crt_file:
+            tls = (key_file.read(), crt_file.read())
+
+    sock = _bind_socket(settings.port)
+    asyncio.run(_supervise(settings, sock, tls))
+
+
+async def _supervise(settings: ServerSettings, sock: socket.socket, tls: Optional[Tuple[bytes, bytes]]) -> None:
+    shared = None
+    if settings.shared_cache:
+        shared = SharedCacheServer(
+            settings.shared_cache_path, settings.shared_cache_size, namespace_maxsize=settings.tenant_cache_size
+        )
+        await shared.start()
+
+    context = multiprocessing.get_context("spawn")
+
+    def spawn(index: int) -> multiprocessing.Process:
+        process = context.Process(
+            target=_run_worker, args=(settings, sock, tls), name=f"qloo-mcp-worker-{index}"
+        )
+        process.start()
+        return process
+
+    processes: List[multiprocessing.Process] = [spawn(i) for i in range(settings.workers)]
+    print(f"Started {settings.workers} workers on port {settings.port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        while not stop.is_set():
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    print(f"Worker {process.name} exited with code {process.exitcode}, restarting", file=sys.stderr)
+                    processes[i] = spawn(i)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            await loop.run_in_executor(None, process.join)
+        if shared is not None:
+            await shared.close()
+            os.unlink(settings.shared_cache_path)
+        sock.close()